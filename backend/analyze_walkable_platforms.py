@@ -5,10 +5,152 @@ Identifies ONLY green grass walkable surfaces, excludes decorative elements
 """
 
 from PIL import Image, ImageDraw
+from collections import namedtuple
+from typing import Optional, Union
+import functools
 import json
+import os
+import numpy as np
 
+# Green-grass detection thresholds (RGB)
+GRASS_MIN_GREEN = 100       # Minimum green channel value for a grass pixel
+SOIL_PROBE_ROWS = 12        # Rows under a grass band searched for soil (dirt, wood, rock)
+MIN_SOIL_ROWS = 6           # Soil rows needed there; foliage has sky under it and does not count
+TOP_Y_TOLERANCE = 8         # Max top-of-grass step (px) between neighbouring columns of one platform
+MIN_RUN_WIDTH = 4           # Narrower runs of grass tops are anti-aliasing on decorations
+MAX_DECORATION_WIDTH = 40   # Widest stretch of a platform a tree or fence may hide
+MIN_PLATFORM_WIDTH = 50     # Narrower runs are noise / not wide enough for the character
+PLATFORM_HEIGHT = 20        # Minimum collision thickness below the top of a platform
+SPAWN_CLEARANCE = 100       # Spawn this far above the spawn platform's top
+NO_PLATFORM = -1            # top_y_by_column value for columns without a walkable platform
+MIN_BROADPHASE_CELL = 32    # Smallest spatial-hash cell size (px)
+BROADPHASE_MIN_PLATFORMS = 32  # Below this many platforms a linear AABB scan is faster than the grid
 
-def analyze_walkable_platforms(image_path: str):
+
+# Decoded background shared by the analyze + visualize passes
+DecodedBackground = namedtuple('DecodedBackground', ['rgba_image', 'rgb_array'])
+
+
+@functools.lru_cache(maxsize=8)
+def _decode_background(image_path: str, mtime: float) -> DecodedBackground:
+    """Decode a background once; mtime is part of the key so edited files are re-read"""
+    rgba_image = Image.open(image_path).convert('RGBA')
+    rgb_array = np.asarray(rgba_image.convert('RGB'))
+    rgb_array.flags.writeable = False  # Shared between callers
+    return DecodedBackground(rgba_image, rgb_array)
+
+
+def load_background(image_path: str) -> DecodedBackground:
+    """Return the decoded (RGBA image, RGB array) pair for a background, memoized"""
+    image_path = str(image_path)
+    return _decode_background(image_path, os.path.getmtime(image_path))
+
+
+def _runs(values: np.ndarray):
+    """Split a 1D array into (start, end) runs of equal consecutive values (end exclusive)"""
+    breaks = np.flatnonzero(np.diff(values)) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [len(values)]))
+    return starts, ends
+
+
+def _surface_edges(rgb: np.ndarray):
+    """
+    Top edge of every grass band that rests on soil, for all columns at once
+
+    A column can hold several platforms, so each grass/non-grass transition is a
+    candidate rather than only the first green pixel. Foliage is green too, but a
+    canopy has sky under it, so only bands followed by soil within SOIL_PROBE_ROWS
+    are kept.
+
+    Returns:
+        (xs, ys, thickness, ground) - edge columns and rows sorted by column then row,
+        the grass band thickness under each edge, and the grass-or-soil mask
+    """
+    height = rgb.shape[0]
+    r, g, b = (rgb[..., i].astype(np.int16) for i in range(3))
+
+    # Green grass: bright green channel that dominates red and blue
+    green = (g >= GRASS_MIN_GREEN) & (g > r) & (g > b)
+    # Soil: anything that is neither grass nor sky/cloud (which are blue-dominant)
+    soil = ~green & ~((b >= r) & (b >= g))
+
+    tops = green.copy()
+    tops[1:] &= ~green[:-1]
+    bottoms = green.copy()
+    bottoms[:-1] &= ~green[1:]
+
+    # Transposed so nonzero() orders edges by column; the n-th top and n-th bottom
+    # of a column delimit the same band
+    xs, ys = np.nonzero(tops.T)
+    _, bottom_ys = np.nonzero(bottoms.T)
+
+    soil_rows = np.zeros((height + 1, soil.shape[1]), dtype=np.int32)
+    np.cumsum(soil, axis=0, out=soil_rows[1:])
+    probe_start = np.minimum(bottom_ys + 1, height)
+    probe_end = np.minimum(bottom_ys + 1 + SOIL_PROBE_ROWS, height)
+    on_soil = soil_rows[probe_end, xs] - soil_rows[probe_start, xs] >= MIN_SOIL_ROWS
+
+    thickness = bottom_ys - ys + 1
+    return xs[on_soil], ys[on_soil], thickness[on_soil], green | soil
+
+
+def _trace_runs(xs: np.ndarray, ys: np.ndarray, thickness: np.ndarray) -> list:
+    """Chain edges of neighbouring columns whose tops are within TOP_Y_TOLERANCE into runs"""
+    runs = []
+    previous, current, last_x = [], [], None
+    for x, y, t in zip(xs.tolist(), ys.tolist(), thickness.tolist()):
+        if x != last_x:
+            previous = current if last_x == x - 1 else []
+            current, last_x = [], x
+        candidates = [run for run in previous
+                      if abs(run['ys'][-1] - y) <= TOP_Y_TOLERANCE and run not in current]
+        if candidates:
+            run = min(candidates, key=lambda run: abs(run['ys'][-1] - y))
+        else:
+            run = {'x0': x, 'ys': [], 'thickness': []}
+            runs.append(run)
+        run['x1'] = x + 1
+        run['ys'].append(y)
+        run['thickness'].append(t)
+        current.append(run)
+    return runs
+
+
+def _join_runs(runs: list, ground: np.ndarray) -> list:
+    """
+    Join runs at the same height across holes where decorations hide the grass
+
+    A tree trunk, a canopy touching the grass or a fence post removes the grass top
+    from a few columns. Runs are joined across such a hole when it is at most
+    MAX_DECORATION_WIDTH wide and every column in it still has grass or soil at the
+    platform's height; a real gap shows sky there.
+    """
+    runs = sorted((run for run in runs if run['x1'] - run['x0'] >= MIN_RUN_WIDTH),
+                  key=lambda run: run['x0'])
+    joined = []
+    for run in runs:
+        y = int(np.median(run['ys']))
+        target = None
+        for platform in joined:
+            if (run['x0'] - platform['x1'] > MAX_DECORATION_WIDTH
+                    or abs(platform['y'] - y) > TOP_Y_TOLERANCE):
+                continue
+            hole = ground[min(platform['y'], y):max(platform['y'], y) + TOP_Y_TOLERANCE,
+                          platform['x1']:run['x0']]
+            if hole.any(axis=0).all() and (target is None or platform['x1'] > target['x1']):
+                target = platform
+        if target is None:
+            joined.append({**run, 'y': y})
+        else:
+            target['x1'] = max(target['x1'], run['x1'])
+            target['ys'] = target['ys'] + run['ys']
+            target['thickness'] = target['thickness'] + run['thickness']
+            target['y'] = int(np.median(target['ys']))
+    return joined
+
+
+def analyze_walkable_platforms(image: Union[str, DecodedBackground]):
     """
     Analyze pixel art background to identify ONLY walkable green grass platforms.
 
@@ -17,84 +159,73 @@ def analyze_walkable_platforms(image_path: str):
     - Trees are decorative (no collision)
     - Fences are decorative (no collision)
     - Gaps between platforms require jumping
-    """
-
-    img = Image.open(image_path)
-    width, height = img.size
 
-    print(f"Background size: {width}x{height}")
-
-    # Identified walkable grass platforms ONLY
-    # These are precise based on visual analysis of green grass surfaces
-
-    platforms = [
-        # Bottom ground - green grass platform (fence is decorative, sits on top)
-        {
-            "name": "Bottom Ground",
-            "x": 0,
-            "y": 740,  # Top of green grass
-            "width": width,
-            "height": 28,  # Just the grass layer
-            "walkable": True
-        },
+    Platforms are derived from the pixels with a vectorized green mask: every
+    grass band resting on soil is a candidate surface, edges of neighbouring
+    columns at a roughly constant height are chained into runs, and runs are
+    joined across the holes trees and fences leave in the grass.
 
-        # Left floating island - top green grass only
-        {
-            "name": "Left Island",
-            "x": 0,
-            "y": 593,  # Top of green grass
-            "width": 205,
-            "height": 20,
-            "walkable": True
-        },
+    Args:
+        image: Path to the background, or a preloaded DecodedBackground
+    """
 
-        # Middle-left small platform - green grass
-        {
-            "name": "Middle-Left Platform",
-            "x": 215,
-            "y": 668,  # Top of green grass
-            "width": 158,
-            "height": 20,
-            "walkable": True
-        },
+    background = image if isinstance(image, DecodedBackground) else load_background(image)
+    rgb = background.rgb_array
+    height, width = rgb.shape[:2]
 
-        # Middle bridge area - green grass under/around fence
-        # Note: Fence itself is NOT a collision object
-        {
-            "name": "Middle Bridge Platform",
-            "x": 398,
-            "y": 648,  # Top of green grass
-            "width": 198,
-            "height": 20,
-            "walkable": True
-        },
+    print(f"Background size: {width}x{height}")
 
-        # Right large island - green grass on top
-        {
-            "name": "Right Island",
-            "x": 680,
-            "y": 593,  # Top of green grass
-            "width": 344,
-            "height": 20,
+    xs, ys, thickness, ground = _surface_edges(rgb)
+    runs = [run for run in _join_runs(_trace_runs(xs, ys, thickness), ground)
+            if run['x1'] - run['x0'] >= MIN_PLATFORM_WIDTH]
+    runs.sort(key=lambda run: (run['y'], run['x0']))
+
+    platforms = []
+    # Walkable Y of the topmost platform per column, so collision checks are a single
+    # index instead of a platform scan
+    top_y_by_column = np.full(width, NO_PLATFORM, dtype=np.int16)
+    for run in runs:
+        start, end, platform_y = run['x0'], run['x1'], run['y']  # Top of green grass
+        column_tops = top_y_by_column[start:end]
+        column_tops[column_tops == NO_PLATFORM] = platform_y
+        platforms.append({
+            "name": f"Platform {len(platforms) + 1}",
+            "x": int(start),
+            "y": platform_y,
+            "width": int(end - start),
+            "height": max(PLATFORM_HEIGHT, int(np.median(run['thickness']))),  # The grass layer
             "walkable": True
-        },
-    ]
-
-    # Calculate good spawn position - on bottom ground, clear of obstacles
-    spawn_x = width // 2
-    spawn_y = 640  # Well above bottom ground
-
-    # Identify gaps (non-walkable areas that require jumping)
-    gaps = [
-        {"start_x": 205, "end_x": 215, "description": "Gap between left island and middle-left platform"},
-        {"start_x": 373, "end_x": 398, "description": "Gap between middle-left and bridge"},
-        {"start_x": 596, "end_x": 680, "description": "Gap between bridge and right island"},
-    ]
+        })
+
+    has_grass = top_y_by_column != NO_PLATFORM
+
+    # Identify gaps (columns without a platform at any height, bounded by platforms on both sides)
+    gaps = []
+    grass_starts, grass_ends = _runs(has_grass)
+    for start, end in zip(grass_starts, grass_ends):
+        if has_grass[start] or start == 0 or end == width:
+            continue
+        gaps.append({
+            "start_x": int(start),
+            "end_x": int(end),
+            "description": f"Gap of {int(end - start)}px with no walkable grass"
+        })
+
+    # Calculate good spawn position - above the bottom ground (lowest, then widest platform)
+    if platforms:
+        spawn_platform = max(platforms, key=lambda p: (p["y"], p["width"]))
+        spawn_x = spawn_platform["x"] + spawn_platform["width"] // 2
+        spawn_y = max(0, spawn_platform["y"] - SPAWN_CLEARANCE)
+    else:
+        spawn_x = width // 2
+        spawn_y = height // 2
 
     return {
         "width": width,
         "height": height,
         "platforms": platforms,
+        "top_y_by_column": top_y_by_column.tolist(),
+        "broadphase": _build_broadphase(platforms),
         "gaps": gaps,
         "spawn": {
             "x": spawn_x,
@@ -109,44 +240,139 @@ def analyze_walkable_platforms(image_path: str):
     }
 
 
-def visualize_walkable_platforms(image_path: str, analysis: dict, output_path: str):
+def _build_broadphase(platforms: list) -> dict:
+    """
+    Spatial-hash grid over platform AABBs: maps "cx,cy" cell keys to platform indices
+
+    Cells are twice the mean platform width so most platforms touch only a couple of
+    cells. Keys are strings so the analysis stays JSON-serialisable; a flat
+    array-backed port would hash (cx * 73856093) ^ (cy * 19349663) instead.
+    """
+    if not platforms:
+        return {"cell": MIN_BROADPHASE_CELL, "grid": {}}
+
+    mean_width = sum(p["width"] for p in platforms) / len(platforms)
+    cell = max(MIN_BROADPHASE_CELL, int(2 * mean_width))
+    grid = {}
+    for index, p in enumerate(platforms):
+        for cx in range(p["x"] // cell, (p["x"] + p["width"]) // cell + 1):
+            for cy in range(p["y"] // cell, (p["y"] + p["height"]) // cell + 1):
+                grid.setdefault(f"{cx},{cy}", []).append(index)
+    return {"cell": cell, "grid": grid}
+
+
+def query_platforms(analysis: dict, x: int, y: int, width: int, height: int) -> list:
+    """
+    Indices of platforms whose rectangle overlaps the given AABB
+
+    Uses the analysis broadphase grid, or a linear scan when there are only a few platforms.
+
+    Args:
+        analysis: Result of analyze_walkable_platforms
+        x, y, width, height: Query box in background pixels
+    """
+    platforms = analysis["platforms"]
+
+    def overlaps(p):
+        return (p["x"] <= x + width and x <= p["x"] + p["width"]
+                and p["y"] <= y + height and y <= p["y"] + p["height"])
+
+    if len(platforms) < BROADPHASE_MIN_PLATFORMS:
+        return [i for i, p in enumerate(platforms) if overlaps(p)]
+
+    cell, grid = analysis["broadphase"]["cell"], analysis["broadphase"]["grid"]
+    candidates = set()
+    for cx in range(x // cell, (x + width) // cell + 1):
+        for cy in range(y // cell, (y + height) // cell + 1):
+            candidates.update(grid.get(f"{cx},{cy}", ()))
+    return sorted(i for i in candidates if overlaps(platforms[i]))
+
+
+def get_platform_y(analysis: dict, x: int, below_y: Optional[int] = None) -> Optional[int]:
+    """
+    Walkable Y (top of the platform) at column x, or None over a gap / off-screen
+
+    Without below_y this is the topmost platform in the column; with it, the first
+    platform whose top is at or below that row (where something falling from below_y lands).
+
+    Args:
+        analysis: Result of analyze_walkable_platforms
+        x: Column in background pixels
+        below_y: Optional row to search downwards from
+    """
+    top_y_by_column = analysis['top_y_by_column']
+    if not 0 <= x < len(top_y_by_column):
+        return None
+    y = top_y_by_column[x]
+    if y == NO_PLATFORM:
+        return None
+    if below_y is None or y >= below_y:
+        return y
+    return min((p['y'] for p in analysis['platforms']
+                if p['x'] <= x < p['x'] + p['width'] and p['y'] >= below_y), default=None)
+
+
+def _fill_rect(overlay: np.ndarray, x1: int, y1: int, x2: int, y2: int, color):
+    """Paint the inclusive rectangle [x1, x2] x [y1, y2] with one slice write, clipped to the overlay"""
+    height, width = overlay.shape[:2]
+    x1, y1 = max(0, x1), max(0, y1)
+    x2, y2 = min(width - 1, x2), min(height - 1, y2)
+    if x1 <= x2 and y1 <= y2:
+        overlay[y1:y2 + 1, x1:x2 + 1] = color
+
+
+def _outline_rect(overlay: np.ndarray, x1: int, y1: int, x2: int, y2: int, color, width: int):
+    """Paint an inset rectangle outline as four slice writes"""
+    _fill_rect(overlay, x1, y1, x2, y1 + width - 1, color)   # top
+    _fill_rect(overlay, x1, y2 - width + 1, x2, y2, color)   # bottom
+    _fill_rect(overlay, x1, y1, x1 + width - 1, y2, color)   # left
+    _fill_rect(overlay, x2 - width + 1, y1, x2, y2, color)   # right
+
+
+def visualize_walkable_platforms(image: Union[str, DecodedBackground], analysis: dict, output_path: str):
     """Visualize ONLY walkable platforms and gaps"""
 
-    img = Image.open(image_path).convert('RGBA')
-    overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
-    draw = ImageDraw.Draw(overlay)
+    background = image if isinstance(image, DecodedBackground) else load_background(image)
+    img = background.rgba_image
+    height, width = background.rgb_array.shape[:2]
+
+    # Shapes are blitted into a NumPy RGBA overlay with slice writes
+    overlay = np.zeros((height, width, 4), dtype=np.uint8)
 
     # Draw walkable platforms in green
-    for platform in analysis['platforms']:
-        if platform.get('walkable'):
-            x, y = platform['x'], platform['y']
-            w, h = platform['width'], platform['height']
-
-            # Draw platform
-            draw.rectangle(
-                [x, y, x + w, y + h],
-                fill=(0, 255, 0, 120),
-                outline=(0, 255, 0, 255),
-                width=3
-            )
-
-            # Label
-            draw.text((x + 5, y - 15), platform['name'], fill=(255, 255, 255, 255))
-
-    # Draw gaps in red
+    walkable = [p for p in analysis['platforms'] if p.get('walkable')]
+    for platform in walkable:
+        x, y = platform['x'], platform['y']
+        w, h = platform['width'], platform['height']
+        _fill_rect(overlay, x, y, x + w, y + h, (0, 255, 0, 120))
+        _outline_rect(overlay, x, y, x + w, y + h, (0, 255, 0, 255), 3)
+
+    # Draw gaps in red (5px line centred on y=650)
     for gap in analysis['gaps']:
-        x1, x2 = gap['start_x'], gap['end_x']
-        draw.line([(x1, 650), (x2, 650)], fill=(255, 0, 0, 255), width=5)
-        draw.text((x1, 630), "GAP", fill=(255, 0, 0, 255))
+        _fill_rect(overlay, gap['start_x'], 648, gap['end_x'], 652, (255, 0, 0, 255))
 
-    # Draw spawn point
+    # Draw spawn point (filled disk with a 2px white ring)
     spawn_x, spawn_y = analysis['spawn']['x'], analysis['spawn']['y']
-    draw.ellipse(
-        [spawn_x - 15, spawn_y - 15, spawn_x + 15, spawn_y + 15],
-        fill=(255, 0, 255, 200),
-        outline=(255, 255, 255, 255),
-        width=2
-    )
+    radius = 15
+    y0, y1 = max(0, spawn_y - radius), min(height, spawn_y + radius + 1)
+    x0, x1 = max(0, spawn_x - radius), min(width, spawn_x + radius + 1)
+    if y0 < y1 and x0 < x1:
+        yy, xx = np.ogrid[y0:y1, x0:x1]
+        dist_sq = (yy - spawn_y) ** 2 + (xx - spawn_x) ** 2
+        region = overlay[y0:y1, x0:x1]
+        region[dist_sq <= radius ** 2] = (255, 0, 255, 200)
+        region[(dist_sq <= radius ** 2) & (dist_sq > (radius - 2) ** 2)] = (255, 255, 255, 255)
+
+    # Text labels are still drawn with PIL
+    overlay_img = Image.fromarray(overlay, 'RGBA')
+    draw = ImageDraw.Draw(overlay_img)
+
+    for platform in walkable:
+        draw.text((platform['x'] + 5, platform['y'] - 15), platform['name'], fill=(255, 255, 255, 255))
+
+    for gap in analysis['gaps']:
+        draw.text((gap['start_x'], 630), "GAP", fill=(255, 0, 0, 255))
+
     draw.text((spawn_x + 20, spawn_y - 10), "SPAWN", fill=(255, 0, 255, 255))
 
     # Add notes
@@ -155,7 +381,7 @@ def visualize_walkable_platforms(image_path: str, analysis: dict, output_path: s
         draw.text((10, y_offset), f"• {note}", fill=(255, 255, 255, 255))
         y_offset += 20
 
-    result = Image.alpha_composite(img, overlay)
+    result = Image.alpha_composite(img, overlay_img)
     result.save(output_path)
     print(f"✓ Walkable platform visualization saved to: {output_path}")
 
@@ -166,7 +392,8 @@ if __name__ == "__main__":
     print("="*70)
 
     bg_path = "test_background.png"
-    analysis = analyze_walkable_platforms(bg_path)
+    background = load_background(bg_path)
+    analysis = analyze_walkable_platforms(background)
 
     print(f"\n📊 Analysis Results:")
     print(f"  Background: {analysis['width']}x{analysis['height']}")
@@ -189,11 +416,11 @@ if __name__ == "__main__":
 
     # Create visualization
     viz_path = "walkable_platforms_analysis.png"
-    visualize_walkable_platforms(bg_path, analysis, viz_path)
+    visualize_walkable_platforms(background, analysis, viz_path)
 
     # Save for game generation
     with open("walkable_platforms.json", 'w') as f:
-        json.dump(analysis, f, indent=2)
+        json.dump(analysis, f, separators=(',', ':'))
 
     print(f"\n✓ Analysis saved to: walkable_platforms.json")
     print("="*70)
@@ -1,87 +1,200 @@
-import json
+import atexit
+import heapq
+import operator
 import os
+import time
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 from pathlib import Path
 
-CACHE_FILE = "prompt_cache.json"
+import orjson
+
+CACHE_FILE = "prompt_cache.jsonl"
+LEGACY_CACHE_FILE = "prompt_cache.json"
+
+
+def _ts_to_iso(ts: float) -> str:
+    """ISO string for stored epoch seconds"""
+    return datetime.fromtimestamp(ts).isoformat(timespec='seconds')
+
+
+def _to_ts(timestamp: Union[float, str]) -> float:
+    """Epoch seconds for a stored timestamp; older records carry an ISO string"""
+    if not isinstance(timestamp, str):
+        return timestamp
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except ValueError:
+        return 0.0
+
 
 class CacheManager:
+    """
+    Prompt cache backed by an append-only JSONL log.
+
+    Each set() appends one record and each delete() appends a tombstone, so writes
+    are O(1) instead of rewriting the whole file. The log is compacted back down to
+    the live entries on close() or once it grows past twice the live size.
+    """
+
     def __init__(self, cache_file: str = CACHE_FILE):
         self.cache_file = cache_file
-        self.cache_data: Dict = self._load_cache()
-    
-    def _load_cache(self) -> Dict:
-        """Load cache from JSON file"""
-        if os.path.exists(self.cache_file):
-            try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Error loading cache: {e}")
-                return {}
-        return {}
+        self._log_records = 0
+        # Results and timestamps are kept in parallel dicts keyed by prompt
+        self._results: Dict[str, str] = {}
+        self._timestamps: Dict[str, float] = {}
+        self._load_cache()
+        self._log = open(self.cache_file, 'ab')
     
-    def _save_cache(self):
-        """Save cache to JSON file"""
+    def _load_cache(self):
+        """Load cache by replaying the JSONL log (later records win)"""
+        if not os.path.exists(self.cache_file):
+            self._migrate_legacy_cache()
+            return
+
+        try:
+            with open(self.cache_file, 'rb') as f:
+                for line in f:
+                    try:
+                        record = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        # Torn write from a crash mid-append - skip it
+                        continue
+                    self._log_records += 1
+                    prompt = record['p']
+                    if record.get('d'):
+                        self._results.pop(prompt, None)
+                        self._timestamps.pop(prompt, None)
+                    else:
+                        self._results[prompt] = record['r']
+                        self._timestamps[prompt] = _to_ts(record['t'])
+        except IOError as e:
+            print(f"Error loading cache: {e}")
+
+    def _migrate_legacy_cache(self):
+        """Import a pre-JSONL prompt_cache.json once, rewriting it as a log"""
+        legacy_file = Path(self.cache_file).with_name(LEGACY_CACHE_FILE)
+        if not legacy_file.exists():
+            return
+        try:
+            cache_data = orjson.loads(legacy_file.read_bytes())
+        except (orjson.JSONDecodeError, IOError) as e:
+            print(f"Error loading cache: {e}")
+            return
+        for prompt, data in cache_data.items():
+            self._results[prompt] = data['result']
+            self._timestamps[prompt] = _to_ts(data.get('timestamp', ''))
+        self._write_snapshot()
+
+    @staticmethod
+    def _encode_record(prompt: str, result: str, ts: float) -> bytes:
+        return orjson.dumps({'p': prompt, 'r': result, 't': ts}) + b"\n"
+
+    def _write_snapshot(self):
+        """Atomically replace the log with one record per live entry"""
+        tmp_file = f"{self.cache_file}.tmp"
+        timestamps = self._timestamps
+        with open(tmp_file, 'wb') as f:
+            f.write(b''.join(
+                self._encode_record(prompt, result, timestamps[prompt])
+                for prompt, result in self._results.items()
+            ))
+        os.replace(tmp_file, self.cache_file)
+        self._log_records = len(self._results)
+
+    def _append(self, record: bytes):
+        """Append one record to the log, compacting if it has grown too large"""
+        try:
+            self._log.write(record)
+            self._log.flush()
+            self._log_records += 1
+            if self._log_records > 2 * max(len(self._results), 1):
+                self._compact()
+        except IOError as e:
+            print(f"Error saving cache: {e}")
+
+    def _compact(self):
+        """Rewrite the log from the live entries and reopen the append handle"""
+        self._log.close()
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache_data, f, indent=2, ensure_ascii=False)
+            self._write_snapshot()
+        finally:
+            self._log = open(self.cache_file, 'ab')
+
+    def close(self):
+        """Compact the log and release the file handle"""
+        if self._log.closed:
+            return
+        try:
+            self._compact()
         except IOError as e:
             print(f"Error saving cache: {e}")
+        self._log.close()
     
     def get(self, prompt: str) -> Optional[str]:
         """Get cached result for a prompt"""
-        return self.cache_data.get(prompt, {}).get('result')
+        return self._results.get(prompt)
     
     def set(self, prompt: str, result: str):
         """Cache a prompt result"""
-        self.cache_data[prompt] = {
-            'result': result,
-            'timestamp': datetime.now().isoformat()
-        }
-        self._save_cache()
+        ts = time.time()
+        self._results[prompt] = result
+        self._timestamps[prompt] = ts
+        self._append(self._encode_record(prompt, result, ts))
     
-    def get_all_prompts(self) -> List[Dict[str, str]]:
-        """Get list of all cached prompts with metadata"""
-        prompts = []
-        for prompt, data in self.cache_data.items():
-            prompts.append({
+    def get_all_prompts(self, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        """
+        Get list of cached prompts with metadata, newest first
+        
+        Args:
+            limit: Only return the most recent `limit` prompts (all if None)
+        """
+        by_ts = operator.itemgetter(1)
+        if limit is None:
+            entries = sorted(self._timestamps.items(), key=by_ts, reverse=True)
+        else:
+            entries = heapq.nlargest(limit, self._timestamps.items(), key=by_ts)
+        return [
+            {
                 'prompt': prompt,
-                'timestamp': data.get('timestamp', ''),
+                'timestamp': _ts_to_iso(ts),
                 'preview': prompt[:100] + '...' if len(prompt) > 100 else prompt
-            })
-        # Sort by timestamp, newest first
-        prompts.sort(key=lambda x: x['timestamp'], reverse=True)
-        return prompts
+            }
+            for prompt, ts in entries
+        ]
     
     def get_cached_result(self, prompt: str) -> Optional[Dict[str, any]]:
         """Get full cached data for a prompt"""
-        if prompt in self.cache_data:
+        if prompt in self._results:
             return {
                 'prompt': prompt,
-                'result': self.cache_data[prompt]['result'],
-                'timestamp': self.cache_data[prompt]['timestamp']
+                'result': self._results[prompt],
+                'timestamp': _ts_to_iso(self._timestamps[prompt])
             }
         return None
     
     def exists(self, prompt: str) -> bool:
         """Check if prompt exists in cache"""
-        return prompt in self.cache_data
+        return prompt in self._results
     
     def clear(self):
         """Clear all cache"""
-        self.cache_data = {}
-        self._save_cache()
+        self._results = {}
+        self._timestamps = {}
+        try:
+            self._compact()
+        except IOError as e:
+            print(f"Error saving cache: {e}")
     
     def delete(self, prompt: str) -> bool:
         """Delete a specific cached prompt"""
-        if prompt in self.cache_data:
-            del self.cache_data[prompt]
-            self._save_cache()
+        if prompt in self._results:
+            del self._results[prompt]
+            del self._timestamps[prompt]
+            self._append(orjson.dumps({'p': prompt, 'd': True}) + b"\n")
             return True
         return False
 
 # Global cache instance
 cache = CacheManager()
-
+atexit.register(cache.close)
@@ -4,13 +4,86 @@ Implements granular component-level caching for game generation
 Each component (background, character, mob, collectible) is cached independently
 """
 
-import json
+import asyncio
+import functools
 import hashlib
+import io
+import os
+import time
+import zipfile
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Set, Tuple
 from datetime import datetime
 import shutil
-import base64
+
+import orjson
+import pybase64
+
+from file_utils import atomic_write_bytes
+
+COMPONENT_TYPES = ('background', 'character', 'mob', 'collectible')
+
+# All files of a component are packed into this one uncompressed archive
+COMPONENT_ARCHIVE = "component.zip"
+
+# Members holding the processed sprite (raw image, or the legacy base64 data URL)
+SPRITE_MEMBERS = ("processed_sprite.png", "processed_sprite_base64.txt")
+
+
+def _dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize obj to JSON bytes; compact unless indent is set for human-read files"""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+
+
+def _split_data_url(data_url: str) -> Tuple[str, bytes]:
+    """Split a base64 data URL into (mime_type, raw bytes)"""
+    header, payload = data_url.split(',', 1)
+    mime_type = header[len('data:'):].split(';', 1)[0] or 'image/png'
+    # pybase64 is a SIMD-accelerated drop-in for the stdlib codec
+    return mime_type, pybase64.b64decode(payload, validate=False)
+
+
+def _build_data_url(mime_type: str, raw: bytes) -> str:
+    """Build a base64 data URL from raw bytes"""
+    return f"data:{mime_type};base64,{pybase64.b64encode(raw).decode('ascii')}"
+
+
+def _tree_size(path) -> int:
+    """Total size in bytes of all files under path (DirEntry stats come from the dir read)"""
+    total = 0
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False):
+                total += entry.stat(follow_symlinks=False).st_size
+            elif entry.is_dir(follow_symlinks=False):
+                total += _tree_size(entry.path)
+    return total
+
+
+# (epoch second, ISO string) of the last formatted cached_at
+_last_iso = (None, '')
+
+
+def _now_iso() -> str:
+    """Current time as an ISO string; the string is reused within the same second"""
+    global _last_iso
+    second = int(time.time())
+    if _last_iso[0] != second:
+        _last_iso = (second, datetime.fromtimestamp(second).isoformat())
+    return _last_iso[1]
+
+
+@functools.lru_cache(maxsize=1024)
+def _hash_component_key(component_type: str, url: str, params: tuple) -> str:
+    """Hash a component's identity; params is a sorted tuple of (name, value) pairs"""
+    # Include all parameters that affect the output
+    cache_string = f"{component_type}|{url}"
+    for key, value in params:
+        cache_string += f"|{key}={value}"
+
+    # Hash to get clean key
+    hash_val = hashlib.sha256(cache_string.encode()).hexdigest()[:16]
+    return f"{component_type}_{hash_val}"
 
 
 class ComponentCacheManager:
@@ -19,6 +92,9 @@ class ComponentCacheManager:
     def __init__(self, cache_dir: str = "game_cache/components"):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._component_paths: Dict[str, Path] = {}
+        # Directories already created, so saves skip the mkdir syscall
+        self._known_dirs: Set[Path] = {self.cache_dir}
         
     def _generate_component_key(self, component_type: str, url: str, **kwargs) -> str:
         """
@@ -29,18 +105,49 @@ class ComponentCacheManager:
             url: The asset URL
             **kwargs: Additional parameters that affect processing (e.g., num_frames)
         """
-        # Include all parameters that affect the output
-        cache_string = f"{component_type}|{url}"
-        for key in sorted(kwargs.keys()):
-            cache_string += f"|{key}={kwargs[key]}"
-        
-        # Hash to get clean key
-        hash_val = hashlib.sha256(cache_string.encode()).hexdigest()[:16]
-        return f"{component_type}_{hash_val}"
+        return _hash_component_key(component_type, url, tuple(sorted(kwargs.items())))
     
     def _get_component_path(self, component_key: str) -> Path:
         """Get the directory path for a component"""
-        return self.cache_dir / component_key
+        path = self._component_paths.get(component_key)
+        if path is None:
+            path = self._component_paths[component_key] = self.cache_dir / component_key
+        return path
+
+    def _write_component(self, component_path: Path, members: Dict[str, bytes]):
+        """Pack all of a component's files into a single archive written in one call"""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+            for name, data in members.items():
+                archive.writestr(name, data)
+        if component_path not in self._known_dirs:
+            component_path.mkdir(parents=True, exist_ok=True)
+            self._known_dirs.add(component_path)
+        # A failed write leaves any previously cached archive untouched
+        atomic_write_bytes(component_path / COMPONENT_ARCHIVE, buffer.getvalue())
+
+    def _read_component(self, component_path: Path) -> Optional[Dict[str, bytes]]:
+        """Read all of a component's files, from the archive or the legacy per-file layout"""
+        archive_path = component_path / COMPONENT_ARCHIVE
+        if archive_path.exists():
+            with zipfile.ZipFile(archive_path) as archive:
+                return {name: archive.read(name) for name in archive.namelist()}
+        if component_path.is_dir():
+            # Components cached before archives kept one file per member
+            return {p.name: p.read_bytes() for p in component_path.iterdir() if p.is_file()}
+        return None
+
+    def _has_sprite(self, members: Dict[str, Any]) -> bool:
+        """Check for a stored sprite in either the raw or the legacy base64 layout"""
+        return any(name in members for name in SPRITE_MEMBERS)
+
+    def _load_sprite(self, members: Dict[str, bytes], metadata: Dict[str, Any]) -> str:
+        """Rebuild the processed sprite data URL from the stored bytes"""
+        if "processed_sprite.png" in members:
+            mime_type = metadata.get('sprite_mime_type', 'image/png')
+            return _build_data_url(mime_type, members["processed_sprite.png"])
+        # Components cached before raw storage kept the data URL as text
+        return members["processed_sprite_base64.txt"].decode('utf-8')
     
     # ============ BACKGROUND COMPONENT ============
     
@@ -49,19 +156,16 @@ class ComponentCacheManager:
         component_key = self._generate_component_key("background", background_url)
         component_path = self._get_component_path(component_key)
         
-        platform_analysis_path = component_path / "platform_analysis.json"
-        if not platform_analysis_path.exists():
-            return None
-        
         try:
-            with open(platform_analysis_path, 'r', encoding='utf-8') as f:
-                platform_analysis = json.load(f)
+            members = self._read_component(component_path)
+            if members is None or "platform_analysis.json" not in members:
+                return None
+            
+            platform_analysis = orjson.loads(members["platform_analysis.json"])
             
-            metadata_path = component_path / "metadata.json"
             metadata = {}
-            if metadata_path.exists():
-                with open(metadata_path, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
+            if "metadata.json" in members:
+                metadata = orjson.loads(members["metadata.json"])
             
             return {
                 'platform_analysis': platform_analysis,
@@ -80,30 +184,27 @@ class ComponentCacheManager:
         """Save background platform analysis to cache"""
         component_key = self._generate_component_key("background", background_url)
         component_path = self._get_component_path(component_key)
-        component_path.mkdir(exist_ok=True)
         
         try:
-            # Save platform analysis
-            with open(component_path / "platform_analysis.json", 'w', encoding='utf-8') as f:
-                json.dump(platform_analysis, f, indent=2)
-            
-            # Save metadata
+            cached_at = _now_iso()
             metadata = {
                 'component_type': 'background',
                 'component_key': component_key,
                 'url': background_url,
-                'cached_at': datetime.now().isoformat(),
+                'cached_at': cached_at,
                 'platforms_count': len(platform_analysis.get('platforms', []))
             }
-            with open(component_path / "metadata.json", 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2)
+            
+            # Save platform analysis and metadata
+            self._write_component(component_path, {
+                "platform_analysis.json": _dumps(platform_analysis),
+                "metadata.json": _dumps(metadata, indent=True)
+            })
             
             print(f"✓ Cached background component: {component_key}")
             return component_key
         except Exception as e:
             print(f"Error saving background component: {e}")
-            if component_path.exists():
-                shutil.rmtree(component_path, ignore_errors=True)
             raise
     
     # ============ CHARACTER COMPONENT ============
@@ -113,34 +214,26 @@ class ComponentCacheManager:
         component_key = self._generate_component_key("character", character_url, num_frames=num_frames)
         component_path = self._get_component_path(component_key)
         
-        sprite_config_path = component_path / "sprite_config.json"
-        processed_sprite_path = component_path / "processed_sprite_base64.txt"
-        
-        if not (sprite_config_path.exists() and processed_sprite_path.exists()):
-            return None
-        
         try:
+            members = self._read_component(component_path)
+            if members is None or "sprite_config.json" not in members or not self._has_sprite(members):
+                return None
+            
             # Load sprite config
-            with open(sprite_config_path, 'r', encoding='utf-8') as f:
-                sprite_config = json.load(f)
+            sprite_config = orjson.loads(members["sprite_config.json"])
+            
+            # Load metadata
+            metadata = {}
+            if "metadata.json" in members:
+                metadata = orjson.loads(members["metadata.json"])
             
             # Load processed sprite
-            with open(processed_sprite_path, 'r', encoding='utf-8') as f:
-                processed_sprite_data_url = f.read()
+            processed_sprite_data_url = self._load_sprite(members, metadata)
             
             # Load debug frames if they exist
-            debug_frames_path = component_path / "debug_frames.json"
             debug_frames = []
-            if debug_frames_path.exists():
-                with open(debug_frames_path, 'r', encoding='utf-8') as f:
-                    debug_frames = json.load(f)
-            
-            # Load metadata
-            metadata_path = component_path / "metadata.json"
-            metadata = {}
-            if metadata_path.exists():
-                with open(metadata_path, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
+            if "debug_frames.json" in members:
+                debug_frames = orjson.loads(members["debug_frames.json"])
             
             return {
                 'sprite_config': sprite_config,
@@ -164,41 +257,39 @@ class ComponentCacheManager:
         """Save character sprite processing results to cache"""
         component_key = self._generate_component_key("character", character_url, num_frames=num_frames)
         component_path = self._get_component_path(component_key)
-        component_path.mkdir(exist_ok=True)
         
         try:
-            # Save sprite config
-            with open(component_path / "sprite_config.json", 'w', encoding='utf-8') as f:
-                json.dump(sprite_config, f, indent=2)
-            
-            # Save processed sprite data URL
-            with open(component_path / "processed_sprite_base64.txt", 'w', encoding='utf-8') as f:
-                f.write(processed_sprite_data_url)
+            # Processed sprite is stored as raw image bytes
+            sprite_mime_type, sprite_bytes = _split_data_url(processed_sprite_data_url)
             
-            # Save debug frames if provided
-            if debug_frames:
-                with open(component_path / "debug_frames.json", 'w', encoding='utf-8') as f:
-                    json.dump(debug_frames, f, indent=2)
-            
-            # Save metadata
+            cached_at = _now_iso()
             metadata = {
                 'component_type': 'character',
                 'component_key': component_key,
                 'url': character_url,
                 'num_frames': num_frames,
-                'cached_at': datetime.now().isoformat(),
+                'cached_at': cached_at,
                 'frame_width': sprite_config.get('frame_width'),
-                'frame_height': sprite_config.get('frame_height')
+                'frame_height': sprite_config.get('frame_height'),
+                'sprite_mime_type': sprite_mime_type
+            }
+            
+            members = {
+                "sprite_config.json": _dumps(sprite_config),
+                "processed_sprite.png": sprite_bytes,
+                "metadata.json": _dumps(metadata, indent=True)
             }
-            with open(component_path / "metadata.json", 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2)
+            
+            # Save debug frames if provided
+            if debug_frames:
+                members["debug_frames.json"] = _dumps(debug_frames)
+            
+            self._write_component(component_path, members)
             
             print(f"✓ Cached character component: {component_key}")
             return component_key
         except Exception as e:
             print(f"Error saving character component: {e}")
-            if component_path.exists():
-                shutil.rmtree(component_path, ignore_errors=True)
             raise
     
     # ============ MOB COMPONENT ============
@@ -208,27 +299,21 @@ class ComponentCacheManager:
         component_key = self._generate_component_key("mob", mob_url, num_frames=num_frames)
         component_path = self._get_component_path(component_key)
         
-        sprite_config_path = component_path / "sprite_config.json"
-        processed_sprite_path = component_path / "processed_sprite_base64.txt"
-        
-        if not (sprite_config_path.exists() and processed_sprite_path.exists()):
-            return None
-        
         try:
-            # Load sprite config
-            with open(sprite_config_path, 'r', encoding='utf-8') as f:
-                sprite_config = json.load(f)
+            members = self._read_component(component_path)
+            if members is None or "sprite_config.json" not in members or not self._has_sprite(members):
+                return None
             
-            # Load processed sprite
-            with open(processed_sprite_path, 'r', encoding='utf-8') as f:
-                processed_sprite_data_url = f.read()
+            # Load sprite config
+            sprite_config = orjson.loads(members["sprite_config.json"])
             
             # Load metadata
-            metadata_path = component_path / "metadata.json"
             metadata = {}
-            if metadata_path.exists():
-                with open(metadata_path, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
+            if "metadata.json" in members:
+                metadata = orjson.loads(members["metadata.json"])
+            
+            # Load processed sprite
+            processed_sprite_data_url = self._load_sprite(members, metadata)
             
             return {
                 'sprite_config': sprite_config,
@@ -250,36 +335,33 @@ class ComponentCacheManager:
         """Save mob sprite processing results to cache"""
         component_key = self._generate_component_key("mob", mob_url, num_frames=num_frames)
         component_path = self._get_component_path(component_key)
-        component_path.mkdir(exist_ok=True)
         
         try:
-            # Save sprite config
-            with open(component_path / "sprite_config.json", 'w', encoding='utf-8') as f:
-                json.dump(sprite_config, f, indent=2)
-            
-            # Save processed sprite data URL
-            with open(component_path / "processed_sprite_base64.txt", 'w', encoding='utf-8') as f:
-                f.write(processed_sprite_data_url)
+            # Processed sprite is stored as raw image bytes
+            sprite_mime_type, sprite_bytes = _split_data_url(processed_sprite_data_url)
             
-            # Save metadata
+            cached_at = _now_iso()
             metadata = {
                 'component_type': 'mob',
                 'component_key': component_key,
                 'url': mob_url,
                 'num_frames': num_frames,
-                'cached_at': datetime.now().isoformat(),
+                'cached_at': cached_at,
                 'frame_width': sprite_config.get('frame_width'),
-                'frame_height': sprite_config.get('frame_height')
+                'frame_height': sprite_config.get('frame_height'),
+                'sprite_mime_type': sprite_mime_type
             }
-            with open(component_path / "metadata.json", 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2)
+            
+            self._write_component(component_path, {
+                "sprite_config.json": _dumps(sprite_config),
+                "processed_sprite.png": sprite_bytes,
+                "metadata.json": _dumps(metadata, indent=True)
+            })
             
             print(f"✓ Cached mob component: {component_key}")
             return component_key
         except Exception as e:
             print(f"Error saving mob component: {e}")
-            if component_path.exists():
-                shutil.rmtree(component_path, ignore_errors=True)
             raise
     
     # ============ COLLECTIBLE COMPONENT ============
@@ -289,27 +371,25 @@ class ComponentCacheManager:
         component_key = self._generate_component_key("collectible", collectible_url)
         component_path = self._get_component_path(component_key)
         
-        metadata_analysis_path = component_path / "collectible_metadata.json"
-        sprites_path = component_path / "collectible_sprites.json"
-        
-        if not (metadata_analysis_path.exists() and sprites_path.exists()):
-            return None
-        
         try:
+            members = self._read_component(component_path)
+            if (
+                members is None
+                or "collectible_metadata.json" not in members
+                or "collectible_sprites.json" not in members
+            ):
+                return None
+            
             # Load collectible metadata (from Claude Vision)
-            with open(metadata_analysis_path, 'r', encoding='utf-8') as f:
-                collectible_metadata = json.load(f)
+            collectible_metadata = orjson.loads(members["collectible_metadata.json"])
             
             # Load segmented sprites
-            with open(sprites_path, 'r', encoding='utf-8') as f:
-                collectible_sprites = json.load(f)
+            collectible_sprites = orjson.loads(members["collectible_sprites.json"])
             
             # Load metadata
-            metadata_path = component_path / "metadata.json"
             metadata = {}
-            if metadata_path.exists():
-                with open(metadata_path, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
+            if "metadata.json" in members:
+                metadata = orjson.loads(members["metadata.json"])
             
             return {
                 'collectible_metadata': collectible_metadata,
@@ -330,78 +410,86 @@ class ComponentCacheManager:
         """Save collectible analysis and sprites to cache"""
         component_key = self._generate_component_key("collectible", collectible_url)
         component_path = self._get_component_path(component_key)
-        component_path.mkdir(exist_ok=True)
         
         try:
-            # Save collectible metadata
-            with open(component_path / "collectible_metadata.json", 'w', encoding='utf-8') as f:
-                json.dump(collectible_metadata, f, indent=2)
-            
-            # Save collectible sprites
-            with open(component_path / "collectible_sprites.json", 'w', encoding='utf-8') as f:
-                json.dump(collectible_sprites, f, indent=2)
-            
-            # Save metadata
+            cached_at = _now_iso()
             metadata = {
                 'component_type': 'collectible',
                 'component_key': component_key,
                 'url': collectible_url,
-                'cached_at': datetime.now().isoformat(),
+                'cached_at': cached_at,
                 'collectibles_count': len(collectible_metadata),
                 'sprites_count': len(collectible_sprites)
             }
-            with open(component_path / "metadata.json", 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2)
+            
+            # Save collectible metadata, sprites and cache metadata
+            self._write_component(component_path, {
+                "collectible_metadata.json": _dumps(collectible_metadata),
+                "collectible_sprites.json": _dumps(collectible_sprites),
+                "metadata.json": _dumps(metadata, indent=True)
+            })
             
             print(f"✓ Cached collectible component: {component_key}")
             return component_key
         except Exception as e:
             print(f"Error saving collectible component: {e}")
-            if component_path.exists():
-                shutil.rmtree(component_path, ignore_errors=True)
             raise
     
+    # ============ BATCH LOOKUP ============
+    
+    async def get_components(
+        self,
+        background_url: str,
+        character_url: str,
+        num_frames: int,
+        mob_url: Optional[str] = None,
+        collectible_url: Optional[str] = None
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Look up every component of a game concurrently
+        
+        Each component is an independent archive, so the reads run in worker threads
+        and overlap instead of queueing behind each other. Components without a URL
+        map to None, as do cache misses.
+        """
+        lookups = {
+            'background': (self.get_background_component, background_url),
+            'character': (self.get_character_component, character_url, num_frames),
+        }
+        if mob_url:
+            lookups['mob'] = (self.get_mob_component, mob_url, num_frames)
+        if collectible_url:
+            lookups['collectible'] = (self.get_collectible_component, collectible_url)
+        
+        results = await asyncio.gather(*(asyncio.to_thread(*lookup) for lookup in lookups.values()))
+        components = dict.fromkeys(COMPONENT_TYPES)
+        components.update(zip(lookups, results))
+        return components
+    
     # ============ UTILITY METHODS ============
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get statistics about cached components"""
-        stats = {
-            'background': 0,
-            'character': 0,
-            'mob': 0,
-            'collectible': 0,
-            'total_size_bytes': 0
-        }
+        stats = dict.fromkeys(COMPONENT_TYPES, 0)
+        stats['total_size_bytes'] = 0
         
         if not self.cache_dir.exists():
             return stats
         
-        for component_dir in self.cache_dir.iterdir():
-            if not component_dir.is_dir():
-                continue
-            
-            # Count by type
-            component_name = component_dir.name
-            if component_name.startswith('background_'):
-                stats['background'] += 1
-            elif component_name.startswith('character_'):
-                stats['character'] += 1
-            elif component_name.startswith('mob_'):
-                stats['mob'] += 1
-            elif component_name.startswith('collectible_'):
-                stats['collectible'] += 1
-            
-            # Calculate size
-            for file_path in component_dir.rglob('*'):
-                if file_path.is_file():
-                    stats['total_size_bytes'] += file_path.stat().st_size
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                
+                # Count by type (component keys are "<type>_<hash>")
+                component_type = entry.name.split('_', 1)[0]
+                if component_type in COMPONENT_TYPES:
+                    stats[component_type] += 1
+                
+                # Calculate size
+                stats['total_size_bytes'] += _tree_size(entry.path)
         
-        stats['total_components'] = sum([
-            stats['background'],
-            stats['character'],
-            stats['mob'],
-            stats['collectible']
-        ])
+        stats['total_components'] = sum(stats[t] for t in COMPONENT_TYPES)
         stats['total_size_mb'] = round(stats['total_size_bytes'] / (1024 * 1024), 2)
         
         return stats
@@ -411,6 +499,7 @@ class ComponentCacheManager:
         if self.cache_dir.exists():
             shutil.rmtree(self.cache_dir)
             self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._known_dirs = {self.cache_dir}
             print("✓ Component cache cleared")
 
 
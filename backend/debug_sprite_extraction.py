@@ -5,16 +5,24 @@ Debug script to visualize sprite frame extraction
 
 from sprite_processing.sprite_sheet_analyzer import SpriteSheetAnalyzer
 from PIL import Image, ImageDraw, ImageFont
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dotenv import load_dotenv
-import sys
+import argparse
+import numpy as np
+import os
 
 load_dotenv()
 
 
-def visualize_frame_extraction(sprite_path: str, output_path: str = "debug_frames.png"):
+def visualize_frame_extraction(sprite_path: str, output_path: str = "debug_frames.png", build_strip: bool = False):
     """
     Visualize how frames are being extracted from a sprite sheet
+
+    Args:
+        sprite_path: Sprite sheet to analyze
+        output_path: Where to save the grid overlay image
+        build_strip: Also rebuild the frames into a horizontal strip (debug_horizontal.png)
     """
     sprite_path = Path(sprite_path)
 
@@ -38,7 +46,6 @@ def visualize_frame_extraction(sprite_path: str, output_path: str = "debug_frame
 
     # Create a copy with grid overlay
     debug_img = sprite_img.copy().convert('RGBA')
-    draw = ImageDraw.Draw(debug_img)
 
     # Draw grid based on detected layout
     rows = layout_info['rows']
@@ -50,23 +57,24 @@ def visualize_frame_extraction(sprite_path: str, output_path: str = "debug_frame
     print(f"  Expected grid cells: {rows}×{cols}")
     print(f"  Cell size: {frame_w}×{frame_h}px\n")
 
-    # Draw vertical lines
-    for col in range(cols + 1):
-        x = col * frame_w
-        draw.line([(x, 0), (x, sprite_img.height)], fill=(255, 0, 0, 255), width=2)
-
-    # Draw horizontal lines
-    for row in range(rows + 1):
-        y = row * frame_h
-        draw.line([(0, y), (sprite_img.width, y)], fill=(255, 0, 0, 255), width=2)
+    # Grid lines are 2px slice writes into the pixel array
+    pixels = np.array(debug_img)
+    xs = np.arange(cols + 1) * frame_w
+    xs = np.concatenate((xs, xs + 1))
+    ys = np.arange(rows + 1) * frame_h
+    ys = np.concatenate((ys, ys + 1))
+    pixels[:, xs[xs < sprite_img.width]] = (255, 0, 0, 255)
+    pixels[ys[ys < sprite_img.height], :] = (255, 0, 0, 255)
+    debug_img = Image.fromarray(pixels, 'RGBA')
+    draw = ImageDraw.Draw(debug_img)
 
-    # Label each frame
-    for row in range(rows):
-        for col in range(cols):
-            frame_num = row * cols + col
-            x = col * frame_w + 5
-            y = row * frame_h + 5
-            draw.text((x, y), f"F{frame_num}", fill=(255, 255, 0, 255))
+    # Label each frame (positions for the whole grid computed in one broadcast)
+    row_idx, col_idx = np.meshgrid(np.arange(rows), np.arange(cols), indexing='ij')
+    label_xs = (col_idx * frame_w + 5).ravel().tolist()
+    label_ys = (row_idx * frame_h + 5).ravel().tolist()
+    font = ImageFont.load_default()  # Resolved once instead of per label
+    for frame_num, (x, y) in enumerate(zip(label_xs, label_ys)):
+        draw.text((x, y), f"F{frame_num}", fill=(255, 255, 0, 255), font=font)
 
     # Save debug image
     debug_img.save(output_path)
@@ -88,37 +96,49 @@ def visualize_frame_extraction(sprite_path: str, output_path: str = "debug_frame
     frames_dir = Path("debug_frames")
     frames_dir.mkdir(exist_ok=True)
 
-    for i, frame in enumerate(frames):
-        frame_path = frames_dir / f"frame_{i:02d}.png"
-        frame.save(frame_path)
+    def save_frame(i, frame):
+        # Fast zlib level - these are throwaway inspection images
+        frame.save(frames_dir / f"frame_{i:02d}.png", compress_level=1)
+
+    # PIL releases the GIL while encoding, so frames encode in parallel
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(executor.map(save_frame, range(len(frames)), frames))
 
     print(f"✓ Individual frames saved to: {frames_dir}/")
 
-    # Create horizontal strip
-    from sprite_processing.sprite_sheet_builder import SpriteSheetBuilder
-    builder = SpriteSheetBuilder()
+    horizontal_sheet = None
+    if build_strip:
+        # Create horizontal strip
+        from sprite_processing.sprite_sheet_builder import SpriteSheetBuilder
+        builder = SpriteSheetBuilder()
 
-    horizontal_sheet, metadata = builder.create_horizontal_sheet(
-        frames=frames,
-        frame_width=frame_w,
-        frame_height=frame_h,
-        spacing=0
-    )
+        horizontal_sheet, metadata = builder.create_horizontal_sheet(
+            frames=frames,
+            frame_width=frame_w,
+            frame_height=frame_h,
+            spacing=0
+        )
 
-    horizontal_path = "debug_horizontal.png"
-    horizontal_sheet.save(horizontal_path)
-    print(f"✓ Horizontal strip saved: {horizontal_path}")
+        horizontal_path = "debug_horizontal.png"
+        horizontal_sheet.save(horizontal_path)
+        print(f"✓ Horizontal strip saved: {horizontal_path}")
 
     print(f"\n📊 Summary:")
     print(f"  Original: {sprite_img.size} ({layout_info['layout_type']})")
-    print(f"  Horizontal: {horizontal_sheet.size} (1×{len(frames)})")
+    if horizontal_sheet is not None:
+        print(f"  Horizontal: {horizontal_sheet.size} (1×{len(frames)})")
     print(f"  Frame size: {frame_w}×{frame_h}px")
     print(f"\n💡 Check the debug images to see if frames are extracted correctly!")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python debug_sprite_extraction.py <sprite_sheet_path>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Visualize sprite frame extraction")
+    parser.add_argument("sprite_sheet_path", help="Sprite sheet to debug")
+    parser.add_argument(
+        "--strip",
+        action="store_true",
+        help="Also build the horizontal strip (debug_horizontal.png)"
+    )
+    args = parser.parse_args()
 
-    visualize_frame_extraction(sys.argv[1])
+    visualize_frame_extraction(args.sprite_sheet_path, build_strip=args.strip)
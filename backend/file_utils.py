@@ -0,0 +1,29 @@
+"""
+File helpers shared by the cache managers and the game generator
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """
+    Write data to a uniquely named temp file beside path and swap it in
+
+    Readers see either the old or the new complete file, and concurrent writers of the
+    same path (e.g. two requests caching the same asset) never rename each other's file.
+
+    Args:
+        path: Destination file
+        data: Bytes to write
+    """
+    path = Path(path)
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp",
+                                     delete=False) as f:
+        f.write(data)
+    try:
+        os.replace(f.name, path)
+    except BaseException:
+        os.unlink(f.name)
+        raise
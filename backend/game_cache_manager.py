@@ -3,13 +3,85 @@ Game Cache Manager
 Caches generated games and intermediate processing results to avoid expensive API calls
 """
 
-import json
+import functools
+import io
 import hashlib
+import os
+import struct
+import zipfile
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 import shutil
 
+import orjson
+import pybase64
+
+from file_utils import atomic_write_bytes
+
+# All files of a cached game are packed into this one uncompressed archive
+GAME_ARCHIVE = "game.zip"
+
+
+def _dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize obj to JSON bytes; compact unless indent is set for human-read files"""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+
+
+def _pack_frames(frame_data_urls: List[str]) -> Optional[bytes]:
+    """
+    Pack base64 frame data URLs into one binary bundle of raw image bytes
+
+    Layout: <I frame count> <H mime length> <mime> <I length per frame...> <frame bytes...>
+    Returns None when the frames do not share one mime type.
+    """
+    mime_types = set()
+    frames = []
+    for data_url in frame_data_urls:
+        header, payload = data_url.split(',', 1)
+        mime_types.add(header[len('data:'):].split(';', 1)[0] or 'image/png')
+        frames.append(pybase64.b64decode(payload, validate=False))
+    if len(mime_types) > 1:
+        return None
+    mime = (mime_types.pop() if mime_types else 'image/png').encode('ascii')
+    header = struct.pack(f"<IH{len(mime)}s{len(frames)}I", len(frames), len(mime), mime, *map(len, frames))
+    return header + b''.join(frames)
+
+
+def _unpack_frames(bundle: bytes) -> List[str]:
+    """Rebuild the frame data URLs from a bundle written by _pack_frames"""
+    count, mime_len = struct.unpack_from("<IH", bundle)
+    offset = struct.calcsize("<IH")
+    prefix = f"data:{bundle[offset:offset + mime_len].decode('ascii')};base64,"
+    offset += mime_len
+    lengths = struct.unpack_from(f"<{count}I", bundle, offset)
+    offset += 4 * count
+
+    view = memoryview(bundle)
+    frames = []
+    for length in lengths:
+        frames.append(prefix + pybase64.b64encode(view[offset:offset + length]).decode('ascii'))
+        offset += length
+    return frames
+
+
+@functools.lru_cache(maxsize=1024)
+def _hash_cache_key(
+    background_url: str,
+    character_url: str,
+    mob_url: Optional[str],
+    collectible_url: Optional[str],
+    num_frames: int
+) -> str:
+    """Hash a game's inputs; memoized since lookups and saves repeat the same URLs"""
+    # Feed each input to the hash directly instead of building one joined string;
+    # an 8-byte BLAKE2b digest gives the same 16 hex chars as the old truncated SHA-256
+    hasher = hashlib.blake2b(digest_size=8)
+    for field in (background_url, character_url, mob_url or '', collectible_url or '', str(num_frames)):
+        hasher.update(field.encode())
+        hasher.update(b'|')
+    return hasher.hexdigest()
+
 
 class GameCacheManager:
     """Manages caching of generated games and their intermediate data"""
@@ -17,6 +89,8 @@ class GameCacheManager:
     def __init__(self, cache_dir: str = "game_cache"):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
+        # cache_key -> (mtime_ns of the file holding its manifest, parsed manifest)
+        self._manifest_cache: Dict[str, Tuple[int, Dict[str, Any]]] = {}
         
     def _generate_cache_key(
         self,
@@ -27,15 +101,45 @@ class GameCacheManager:
         num_frames: int
     ) -> str:
         """Generate a unique cache key based on asset URLs and parameters"""
-        # Create a deterministic string from all inputs
-        cache_string = f"{background_url}|{character_url}|{mob_url or ''}|{collectible_url or ''}|{num_frames}"
-        # Hash it to get a clean key
-        return hashlib.sha256(cache_string.encode()).hexdigest()[:16]
+        return _hash_cache_key(background_url, character_url, mob_url, collectible_url, num_frames)
     
     def _get_cache_path(self, cache_key: str) -> Path:
         """Get the directory path for a cache key"""
         return self.cache_dir / cache_key
     
+    def _write_archive(self, cache_path: Path, members: Dict[str, bytes]):
+        """Pack all of a game's files into a single archive written in one call"""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+            for name, data in members.items():
+                archive.writestr(name, data)
+        # Written beside the target and renamed in, so the archive (and exists()) only
+        # ever sees a complete game; a failed save leaves any previous archive intact
+        atomic_write_bytes(cache_path / GAME_ARCHIVE, buffer.getvalue())
+    
+    def _read_archive(self, cache_path: Path, names: Optional[tuple] = None) -> Optional[Dict[str, bytes]]:
+        """
+        Read a cached game's files, from the archive or the legacy per-file layout
+        
+        Args:
+            cache_path: Directory of the cached game
+            names: Only read these members (all if None); missing ones are left out
+        """
+        archive_path = cache_path / GAME_ARCHIVE
+        if archive_path.exists():
+            with zipfile.ZipFile(archive_path) as archive:
+                return {
+                    name: archive.read(name)
+                    for name in archive.namelist() if names is None or name in names
+                }
+        if (cache_path / "game.html").exists():
+            # Games cached before archives kept one file per member
+            return {
+                p.name: p.read_bytes()
+                for p in cache_path.iterdir() if p.is_file() and (names is None or p.name in names)
+            }
+        return None
+    
     def exists(
         self,
         background_url: str,
@@ -50,8 +154,8 @@ class GameCacheManager:
         )
         cache_path = self._get_cache_path(cache_key)
         
-        # Check if game.html exists (indicates complete cache)
-        return (cache_path / "game.html").exists()
+        # The archive (or game.html in the legacy layout) indicates a complete cache
+        return (cache_path / GAME_ARCHIVE).exists() or (cache_path / "game.html").exists()
     
     def get_cached_game(
         self,
@@ -68,39 +172,24 @@ class GameCacheManager:
         cache_path = self._get_cache_path(cache_key)
         
         try:
-            # Load game HTML
-            game_html_path = cache_path / "game.html"
-            if not game_html_path.exists():
+            # One archive read loads every member
+            members = self._read_archive(cache_path)
+            if members is None or "game.html" not in members:
                 return None
             
-            with open(game_html_path, 'r', encoding='utf-8') as f:
-                game_html = f.read()
+            game_html = members["game.html"].decode('utf-8')
+            scene_config = orjson.loads(members["scene_config.json"])
             
-            # Load scene config
-            scene_config_path = cache_path / "scene_config.json"
-            with open(scene_config_path, 'r', encoding='utf-8') as f:
-                scene_config = json.load(f)
-            
-            # Load debug frames if they exist
-            debug_frames_path = cache_path / "debug_frames.json"
+            # Debug frames, debug collectibles and manifest are optional
             debug_frames = []
-            if debug_frames_path.exists():
-                with open(debug_frames_path, 'r', encoding='utf-8') as f:
-                    debug_frames = json.load(f)
-            
-            # Load debug collectibles if they exist
-            debug_collectibles_path = cache_path / "debug_collectibles.json"
-            debug_collectibles = []
-            if debug_collectibles_path.exists():
-                with open(debug_collectibles_path, 'r', encoding='utf-8') as f:
-                    debug_collectibles = json.load(f)
-            
-            # Load manifest
-            manifest_path = cache_path / "manifest.json"
-            manifest = {}
-            if manifest_path.exists():
-                with open(manifest_path, 'r', encoding='utf-8') as f:
-                    manifest = json.load(f)
+            if "debug_frames.bin" in members:
+                debug_frames = _unpack_frames(members["debug_frames.bin"])
+            elif "debug_frames.json" in members:
+                debug_frames = orjson.loads(members["debug_frames.json"])
+            debug_collectibles = (
+                orjson.loads(members["debug_collectibles.json"]) if "debug_collectibles.json" in members else []
+            )
+            manifest = orjson.loads(members["manifest.json"]) if "manifest.json" in members else {}
             
             return {
                 'game_html': game_html,
@@ -139,36 +228,30 @@ class GameCacheManager:
         cache_path.mkdir(exist_ok=True)
         
         try:
-            # Save game HTML
-            with open(cache_path / "game.html", 'w', encoding='utf-8') as f:
-                f.write(game_html)
-            
-            # Save scene config
-            with open(cache_path / "scene_config.json", 'w', encoding='utf-8') as f:
-                json.dump(scene_config, f, indent=2)
-            
-            # Save debug frames
-            with open(cache_path / "debug_frames.json", 'w', encoding='utf-8') as f:
-                json.dump(debug_frames, f, indent=2)
+            members = {
+                "game.html": game_html.encode('utf-8'),
+                "scene_config.json": _dumps(scene_config),
+                "debug_collectibles.json": _dumps(debug_collectibles)
+            }
             
-            # Save debug collectibles
-            with open(cache_path / "debug_collectibles.json", 'w', encoding='utf-8') as f:
-                json.dump(debug_collectibles, f, indent=2)
+            # Debug frames are stored as raw image bytes rather than base64 JSON strings
+            frames_bundle = _pack_frames(debug_frames)
+            if frames_bundle is not None:
+                members["debug_frames.bin"] = frames_bundle
+            else:
+                members["debug_frames.json"] = _dumps(debug_frames)
             
             # Save platform analysis if provided
             if platform_analysis:
-                with open(cache_path / "platform_analysis.json", 'w', encoding='utf-8') as f:
-                    json.dump(platform_analysis, f, indent=2)
+                members["platform_analysis.json"] = _dumps(platform_analysis)
             
             # Save collectible metadata if provided
             if collectible_metadata:
-                with open(cache_path / "collectible_metadata.json", 'w', encoding='utf-8') as f:
-                    json.dump(collectible_metadata, f, indent=2)
+                members["collectible_metadata.json"] = _dumps(collectible_metadata)
             
             # Save collectible sprites if provided
             if collectible_sprites:
-                with open(cache_path / "collectible_sprites.json", 'w', encoding='utf-8') as f:
-                    json.dump(collectible_sprites, f, indent=2)
+                members["collectible_sprites.json"] = _dumps(collectible_sprites)
             
             # Save manifest with metadata
             manifest = {
@@ -183,36 +266,54 @@ class GameCacheManager:
                 'has_collectibles': bool(collectible_url),
                 'has_mob': bool(mob_url)
             }
+            members["manifest.json"] = _dumps(manifest, indent=True)
             
-            with open(cache_path / "manifest.json", 'w', encoding='utf-8') as f:
-                json.dump(manifest, f, indent=2)
+            self._write_archive(cache_path, members)
             
             print(f"✓ Game cached successfully: {cache_key}")
             
         except Exception as e:
             print(f"Error saving game to cache: {e}")
-            # Clean up partial cache on error
-            if cache_path.exists():
-                shutil.rmtree(cache_path, ignore_errors=True)
     
     def get_all_cached_games(self) -> List[Dict[str, Any]]:
         """Get list of all cached games with metadata"""
         games = []
+        manifest_cache = {}
         
-        for cache_dir in self.cache_dir.iterdir():
-            if not cache_dir.is_dir():
-                continue
-            
-            manifest_path = cache_dir / "manifest.json"
-            if not manifest_path.exists():
-                continue
-            
-            try:
-                with open(manifest_path, 'r', encoding='utf-8') as f:
-                    manifest = json.load(f)
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                
+                # The archive (or legacy manifest.json) mtime says whether the manifest changed
+                mtime_ns = None
+                for name in (GAME_ARCHIVE, "manifest.json"):
+                    try:
+                        mtime_ns = os.stat(os.path.join(entry.path, name)).st_mtime_ns
+                        break
+                    except FileNotFoundError:
+                        continue
+                if mtime_ns is None:
+                    continue
+                
+                cached = self._manifest_cache.get(entry.name)
+                if cached and cached[0] == mtime_ns:
+                    manifest = cached[1]
+                else:
+                    try:
+                        members = self._read_archive(Path(entry.path), names=("manifest.json",))
+                        if not members or "manifest.json" not in members:
+                            continue
+                        manifest = orjson.loads(members["manifest.json"])
+                    except Exception as e:
+                        print(f"Error reading manifest for {entry.name}: {e}")
+                        continue
+                
+                manifest_cache[entry.name] = (mtime_ns, manifest)
                 games.append(manifest)
-            except Exception as e:
-                print(f"Error reading manifest for {cache_dir.name}: {e}")
+        
+        # Only keep entries still on disk
+        self._manifest_cache = manifest_cache
         
         # Sort by cached_at, newest first
         games.sort(key=lambda x: x.get('cached_at', ''), reverse=True)
@@ -223,6 +324,7 @@ class GameCacheManager:
         if self.cache_dir.exists():
             shutil.rmtree(self.cache_dir)
             self.cache_dir.mkdir(exist_ok=True)
+            self._manifest_cache = {}
             print("✓ Game cache cleared")
     
     def delete_cached_game(
@@ -248,9 +350,15 @@ class GameCacheManager:
     def get_cache_size(self) -> int:
         """Get total size of cache in bytes"""
         total_size = 0
-        for cache_dir in self.cache_dir.rglob('*'):
-            if cache_dir.is_file():
-                total_size += cache_dir.stat().st_size
+        # DirEntry type and stat data come from the directory read, no per-file Path/stat pair
+        stack = [str(self.cache_dir)]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False):
+                        total_size += entry.stat(follow_symlinks=False).st_size
+                    elif entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
         return total_size
 
 
@@ -5,88 +5,73 @@ Creates playable HTML5 platformer games from character sprites and background im
 """
 
 from pathlib import Path
-from typing import Optional, Dict, Any
-import json
-from PIL import Image
-import anthropic
+from typing import Optional, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import atexit
+import functools
+import hashlib
+import io
+import logging
+import mmap
+import orjson
 import os
-from dotenv import load_dotenv
+import pybase64
+import shutil
+import sys
+import threading
+import time
 
-from sprite_processing.background_remover import BackgroundRemover
-from sprite_processing.sprite_sheet_builder import SpriteSheetBuilder
-from sprite_processing.sprite_sheet_analyzer import SpriteSheetAnalyzer
-from scene_builder.background_analyzer import BackgroundAnalyzer
-from scene_builder.scene_generator import SceneGenerator
-from scene_builder.web_exporter import WebGameExporter
+from file_utils import atomic_write_bytes
 
-load_dotenv()
+# anthropic, PIL, dotenv and the sprite_processing / scene_builder modules are imported
+# where they are first needed so that `--help` and sprite-only callers stay cheap.
 
+# Progress output: one stdout handler instead of print() + manual flushes. Records from a
+# thread running a quiet analysis (see analyze_many) are dropped below WARNING.
+_log_state = threading.local()
 
-class GameGenerator:
-    """
-    Orchestrates the complete pipeline from assets to playable game
-    """
 
-    def __init__(self, output_dir: str = "generated_game"):
-        """
-        Initialize game generator
+class _QuietThreadFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or not getattr(_log_state, "quiet", False)
 
-        Args:
-            output_dir: Directory where game files will be saved
-        """
-        self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(exist_ok=True)
 
-        # Initialize processing modules
-        self.bg_remover = BackgroundRemover()
-        self.sprite_builder = SpriteSheetBuilder()
-        self.bg_analyzer = BackgroundAnalyzer()
-        self.scene_gen = SceneGenerator()
-        self.web_exporter = WebGameExporter()
+logger = logging.getLogger("game_generator")
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.addFilter(_QuietThreadFilter())
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
 
-        # Initialize Anthropic client for VLM analysis (required)
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY required for platform detection. Set it in your .env file.")
-        self.anthropic_client = anthropic.Anthropic(api_key=api_key)
+# Vision model used for platform detection, verification and self-reflection
+VISION_MODEL = "claude-sonnet-4-5"
 
-        # Initialize sprite sheet analyzer
-        self.sprite_analyzer = SpriteSheetAnalyzer(api_key=api_key)
+# Keep-alive pool shared by every Anthropic client in the process (see get_http_client)
+_http_client = None
+_http_client_lock = threading.Lock()
 
-    def analyze_walkable_platforms(self, background_path: Path) -> Dict[str, Any]:
-        """
-        Use VLM (Claude Sonnet 4.5) with extended thinking to identify walkable platforms.
+# Longest edge (px) of the background copy uploaded for platform detection
+MAX_VISION_EDGE = 1024
 
-        Features:
-        - Extended thinking mode for complex reasoning about platform detection
-        - Detailed prompting for reliable JSON responses
-        - Comprehensive validation and error handling
+# Re-encoded opaque uploads above this many pixels go as JPEG (quality 85) instead of PNG
+JPEG_MIN_PIXELS = 512 * 512
 
-        Args:
-            background_path: Path to background image
+# Raw bytes base64-encoded per step when building data URLs (multiple of 3, so chunk
+# outputs concatenate without padding)
+DATA_URL_CHUNK = 57 * 1024
 
-        Returns:
-            Dictionary with platform data, gaps, and spawn point
-        """
-        print(f"\n🔍 Analyzing walkable platforms with Claude Vision API...")
-        print(f"  Features: Extended Thinking + JSON Prompting")
-        print(f"  Background: {background_path.name}")
-
-        # Load and encode image
-        img = Image.open(background_path)
-        width, height = img.size
-        print(f"  Dimensions: {width}x{height}px")
-
-        # Convert image to base64 for Claude API
-        import base64
-        import io
+# Near-duplicate platform cache: 16x16 DCT pHash (256 bits), max Hamming distance for a
+# hit, and how many analyses the LRU index keeps before evicting the oldest
+PHASH_SIZE = 16
+PHASH_MAX_DISTANCE = 4
+PLATFORM_CACHE_MAX_ENTRIES = 200
 
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        img_base64 = base64.standard_b64encode(buffer.getvalue()).decode('utf-8')
-
-        # Create vision analysis prompt
-        prompt = f"""You are analyzing a 2D platformer game background ({width}x{height}px) to identify WALKABLE PLATFORMS where a player character can stand and move.
+# Static platform-detection instructions. Kept free of per-image values so the block
+# is byte-identical across calls and can be served from Anthropic's prompt cache.
+PLATFORM_PROMPT = """You are analyzing a 2D platformer game background to identify WALKABLE PLATFORMS where a player character can stand and move.
 
 CRITICAL: Your bounding boxes must be PRECISE. Players will fall through platforms if your coordinates are wrong!
 
@@ -190,19 +175,19 @@ OUTPUT FORMAT:
 
 Return ONLY valid JSON (no markdown, no explanation):
 
-{{
+{
   "platforms": [
-    {{
+    {
       "name": "Descriptive name (e.g., 'Bottom Ground Platform', 'Upper Left Ledge')",
       "x": 0,
       "y": 740,
       "width": 1024,
       "height": 28,
       "walkable": true
-    }}
+    }
   ],
   "gaps": [
-    {{
+    {
       "description": "Gap between platforms",
       "from_platform": "Platform A name",
       "to_platform": "Platform B name",
@@ -210,114 +195,707 @@ Return ONLY valid JSON (no markdown, no explanation):
       "x": 400,
       "y": 700,
       "height": 20
-    }}
+    }
   ],
-  "spawn": {{
+  "spawn": {
     "x": 100,
     "y": 700
-  }},
+  },
   "notes": [
     "Important observations about the level layout",
     "Any ambiguities or challenges in detection"
   ]
-}}
+}
 
 Now analyze the image and return your analysis in the structured format."""
 
-        # Define tool for structured platform detection
-        tools = [
-            {
-                "name": "report_platform_analysis",
-                "description": "Report the detected walkable platforms, gaps, spawn point, and analysis notes",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "platforms": {
-                            "type": "array",
-                            "description": "List of detected walkable platforms",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "name": {"type": "string", "description": "Descriptive name for the platform"},
-                                    "x": {"type": "integer", "description": "Top-left X coordinate in pixels"},
-                                    "y": {"type": "integer", "description": "Top-left Y coordinate in pixels"},
-                                    "width": {"type": "integer", "description": "Width in pixels"},
-                                    "height": {"type": "integer", "description": "Height in pixels (10-20px for thin walkable surface)"},
-                                    "walkable": {"type": "boolean", "description": "Whether this platform is walkable"}
-                                },
-                                "required": ["name", "x", "y", "width", "height", "walkable"]
-                            }
+# Structured-output tool for platform detection (static, like PLATFORM_PROMPT)
+PLATFORM_TOOLS = [
+    {
+        "name": "report_platform_analysis",
+        "description": "Report the detected walkable platforms, gaps, spawn point, and analysis notes",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "platforms": {
+                    "type": "array",
+                    "description": "List of detected walkable platforms",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "name": {"type": "string", "description": "Descriptive name for the platform"},
+                            "x": {"type": "integer", "description": "Top-left X coordinate in pixels"},
+                            "y": {"type": "integer", "description": "Top-left Y coordinate in pixels"},
+                            "width": {"type": "integer", "description": "Width in pixels"},
+                            "height": {"type": "integer", "description": "Height in pixels (10-20px for thin walkable surface)"},
+                            "walkable": {"type": "boolean", "description": "Whether this platform is walkable"}
                         },
-                        "gaps": {
-                            "type": "array",
-                            "description": "Gaps between platforms requiring jumps",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "description": {"type": "string"},
-                                    "from_platform": {"type": "string"},
-                                    "to_platform": {"type": "string"},
-                                    "width": {"type": "integer"},
-                                    "x": {"type": "integer"},
-                                    "y": {"type": "integer"},
-                                    "height": {"type": "integer"}
-                                },
-                                "required": ["description", "from_platform", "to_platform", "width"]
-                            }
+                        "required": ["name", "x", "y", "width", "height", "walkable"]
+                    }
+                },
+                "gaps": {
+                    "type": "array",
+                    "description": "Gaps between platforms requiring jumps",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "description": {"type": "string"},
+                            "from_platform": {"type": "string"},
+                            "to_platform": {"type": "string"},
+                            "width": {"type": "integer"},
+                            "x": {"type": "integer"},
+                            "y": {"type": "integer"},
+                            "height": {"type": "integer"}
                         },
-                        "spawn": {
-                            "type": "object",
-                            "description": "Player spawn point (should be above a platform)",
-                            "properties": {
-                                "x": {"type": "integer", "description": "Spawn X coordinate"},
-                                "y": {"type": "integer", "description": "Spawn Y coordinate"}
-                            },
-                            "required": ["x", "y"]
+                        "required": ["description", "from_platform", "to_platform", "width"]
+                    }
+                },
+                "spawn": {
+                    "type": "object",
+                    "description": "Player spawn point (should be above a platform)",
+                    "properties": {
+                        "x": {"type": "integer", "description": "Spawn X coordinate"},
+                        "y": {"type": "integer", "description": "Spawn Y coordinate"}
+                    },
+                    "required": ["x", "y"]
+                },
+                "notes": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Important observations about the level"
+                }
+            },
+            "required": ["platforms", "gaps", "spawn", "notes"]
+        }
+    }
+]
+
+# The static instructions go in a cached system block: together with the tools they form a
+# prefix shared across backgrounds, and unlike a breakpoint inside the messages it stays
+# cached when the forced-tool retry switches thinking off
+PLATFORM_SYSTEM = [{"type": "text", "text": PLATFORM_PROMPT, "cache_control": {"type": "ephemeral"}}]
+
+
+# Static self-reflection instructions (sent as REFLECTION_SYSTEM); the per-image size and
+# platform count go in a short note after the image so this block is prompt-cached
+REFLECTION_PROMPT = """You previously analyzed a platformer background and detected platforms on it. The overlay image is in the user message, followed by its size and how many platforms you detected.
+
+I've visualized your detections:
+- GREEN boxes = platforms you detected (labeled P1, P2, etc.)
+- YELLOW circle = spawn point
+
+CRITICAL REVIEW QUESTIONS:
+
+1. **Platform Tops**: Do the green boxes represent just the THIN WALKABLE TOPS of platforms (10-20px high)?
+   - If any platforms show full bodies instead of just tops, they need refinement
+
+2. **Accessibility**: Can the player REACH all detected platforms from spawn by walking/jumping?
+   - Check each platform: Is it reachable via a connected path?
+   - Exclude any floating platforms with no access
+   - Maximum jump height: ~300px vertical
+
+3. **Completeness**: Are there any ACCESSIBLE walkable surfaces you missed?
+   - Look for platforms the player can reach but weren't detected
+
+4. **Accuracy**: Are all coordinates precise?
+   - Check that Y values match the actual top surface
+   - Verify widths span the full walkable extent
+
+Based on your review, choose ONE of these actions:
+
+A) **DETECTIONS ARE GOOD** - No changes needed, current detections are accurate and complete
+B) **REFINEMENTS NEEDED** - Provide updated platform data with corrections
+
+Return your response as JSON:
+{
+  "reflection": {
+    "decision": "GOOD" or "REFINE",
+    "reasoning": "Explain your decision in 2-3 sentences",
+    "issues_found": ["List specific issues if any", "..."],
+    "changes_made": ["List changes if refining", "..."]
+  },
+  "platforms": [...],  // Updated platforms if REFINE, otherwise same as before
+  "gaps": [...],
+  "spawn": {"x": ..., "y": ...},
+  "notes": [...]
+}
+
+Be critical and thorough. If detections aren't perfect, refine them!"""
+
+# Structured-output tool for self-reflection (static, like PLATFORM_TOOLS)
+REFLECTION_TOOLS = [
+    {
+        "name": "report_reflection_result",
+        "description": "Report the reflection decision and refined platform detections",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "reflection": {
+                    "type": "object",
+                    "properties": {
+                        "decision": {"type": "string", "enum": ["GOOD", "REFINE"], "description": "Whether detections are good or need refinement"},
+                        "reasoning": {"type": "string", "description": "Explanation of the decision"},
+                        "issues_found": {"type": "array", "items": {"type": "string"}, "description": "List of issues found"},
+                        "changes_made": {"type": "array", "items": {"type": "string"}, "description": "List of changes made if refining"}
+                    },
+                    "required": ["decision", "reasoning", "issues_found", "changes_made"]
+                },
+                "platforms": {
+                    "type": "array",
+                    "description": "Updated or confirmed platform list",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "name": {"type": "string"},
+                            "x": {"type": "integer"},
+                            "y": {"type": "integer"},
+                            "width": {"type": "integer"},
+                            "height": {"type": "integer"},
+                            "walkable": {"type": "boolean"}
                         },
-                        "notes": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Important observations about the level"
+                        "required": ["name", "x", "y", "width", "height", "walkable"]
+                    }
+                },
+                "gaps": {"type": "array", "items": {"type": "object"}},
+                "spawn": {
+                    "type": "object",
+                    "properties": {
+                        "x": {"type": "integer"},
+                        "y": {"type": "integer"}
+                    },
+                    "required": ["x", "y"]
+                },
+                "notes": {"type": "array", "items": {"type": "string"}}
+            },
+            "required": ["reflection", "platforms", "gaps", "spawn", "notes"]
+        }
+    }
+]
+
+# Cached system block for self-reflection (see PLATFORM_SYSTEM)
+REFLECTION_SYSTEM = [{"type": "text", "text": REFLECTION_PROMPT, "cache_control": {"type": "ephemeral"}}]
+
+
+# run_game.py written next to each generated game (HTTP server that opens game.html)
+RUN_SCRIPT = '''#!/usr/bin/env python3
+"""
+Simple HTTP server to run the game
+This avoids CORS issues when loading local files
+"""
+
+import http.server
+import socketserver
+import webbrowser
+import os
+from pathlib import Path
+
+PORT = 8080
+
+# Change to the directory containing this script
+os.chdir(Path(__file__).parent)
+
+Handler = http.server.SimpleHTTPRequestHandler
+
+print("=" * 70)
+print("🎮 Platformer Game")
+print("=" * 70)
+print(f"\\n🌐 Starting server at http://localhost:{PORT}")
+print(f"📁 Serving files from: {Path.cwd()}")
+print(f"\\n🎯 Opening game in your browser...")
+print(f"\\n⚠️  Press Ctrl+C to stop the server when you're done")
+print("=" * 70 + "\\n")
+
+# Open browser after a short delay
+import threading
+def open_browser():
+    import time
+    time.sleep(1)
+    webbrowser.open(f'http://localhost:{PORT}/game.html')
+
+threading.Thread(target=open_browser, daemon=True).start()
+
+# Start server
+with socketserver.TCPServer(("", PORT), Handler) as httpd:
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\\n\\n✅ Server stopped. Thanks for playing!")
+'''.encode()
+
+
+def get_http_client():
+    """
+    Return the process-wide HTTP/2 client used for Anthropic API calls
+
+    A GameGenerator is created per game, so the pool lives at module level: later
+    games reuse the open TCP+TLS connections instead of handshaking again.
+    """
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            import anthropic
+            # DefaultHttpxClient keeps the SDK's keep-alive socket options and pool limits.
+            # Read timeout stays at the SDK's 600s since extended-thinking calls run long.
+            _http_client = anthropic.DefaultHttpxClient(
+                http2=True,
+                timeout=anthropic.Timeout(600.0, connect=10.0)
+            )
+            atexit.register(_http_client.close)
+        return _http_client
+
+
+def _perceptual_hash(img) -> int:
+    """
+    DCT perceptual hash of an image as a PHASH_SIZE**2-bit integer
+
+    Same scheme as imagehash.phash: greyscale, shrink to 4x the hash size, keep the
+    low-frequency corner of the 2D DCT and set a bit for every coefficient above the
+    median. Re-exports and 1px touch-ups land within a few bits of the original.
+    """
+    import numpy as np
+    from PIL import Image
+    from scipy.fft import dctn
+
+    side = PHASH_SIZE * 4
+    pixels = np.asarray(img.convert('L').resize((side, side), Image.Resampling.LANCZOS), dtype=np.float64)
+    low = dctn(pixels, norm='ortho')[:PHASH_SIZE, :PHASH_SIZE]
+    bits = np.packbits(low > np.median(low))
+    return int.from_bytes(bits.tobytes(), 'big')
+
+
+def _vision_dimensions(width: int, height: int) -> tuple[int, int]:
+    """Size of the copy uploaded to Claude Vision: longest edge capped at MAX_VISION_EDGE"""
+    scale = min(1.0, MAX_VISION_EDGE / max(width, height))
+    return round(width * scale), round(height * scale)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_vision_background(path: str, mtime_ns: int):
+    """Decode + downscale behind _vision_background; mtime_ns keys out edited files"""
+    from PIL import Image
+
+    with Image.open(path) as src:
+        width, height = src.size
+        sent_size = _vision_dimensions(width, height)
+        if sent_size != (width, height):
+            # JPEG sources decode straight at a reduced DCT scale (>= sent_size); no-op for PNG
+            src.draft('RGB', sent_size)
+        img = src.convert('RGBA')
+    if img.size != sent_size:
+        img = img.resize(sent_size, Image.Resampling.BILINEAR)
+    return img, width, height
+
+
+def _vision_background(path: Path):
+    """
+    Background at upload size as RGBA, decoded once per file and shared by the review calls
+
+    Self-reflection and verification each draw their own overlay on top, so only the
+    decoded, downscaled pixels are reusable; callers must treat the image as read-only
+    and draw on a copy.
+
+    Returns:
+        Tuple of (RGBA image at upload size, original width, original height)
+    """
+    return _load_vision_background(str(path), path.stat().st_mtime_ns)
+
+
+def _vision_upload(img) -> tuple[memoryview, str]:
+    """
+    Encode an already-downscaled image for a Claude Vision upload
+
+    Opaque images above JPEG_MIN_PIXELS go as JPEG quality 85 (continuous-tone art is far
+    smaller and faster to encode, and platform work doesn't need lossless pixels); the
+    rest as fast-deflate PNG.
+
+    Returns:
+        Tuple of (encoded bytes, media_type)
+    """
+    opaque = 'transparency' not in img.info and (
+        'A' not in img.getbands() or img.getchannel('A').getextrema()[0] == 255
+    )
+    buffer = io.BytesIO()
+    if opaque and img.width * img.height > JPEG_MIN_PIXELS:
+        img.convert('RGB').save(buffer, format='JPEG', quality=85)
+        return buffer.getbuffer(), "image/jpeg"
+    img.save(buffer, format='PNG', compress_level=1)  # Fast encode for upload
+    return buffer.getbuffer(), "image/png"
+
+
+def _encode_file_to_data_url(path, mime_type: str = "image/png") -> str:
+    """
+    Base64 data URL of a file, built with a single output buffer
+
+    The file is memory-mapped and encoded in DATA_URL_CHUNK slices straight into a
+    pre-sized bytearray that already holds the "data:" prefix, so the only full-size
+    copies are that buffer and the final str (no read() copy, no b64 str + f-string).
+
+    Args:
+        path: File to encode
+        mime_type: MIME type written into the URL
+
+    Returns:
+        "data:<mime_type>;base64,..." string
+    """
+    prefix = f"data:{mime_type};base64,".encode('ascii')
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return prefix.decode('ascii')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            out = bytearray(len(prefix) + 4 * ((size + 2) // 3))
+            out[:len(prefix)] = prefix
+            pos = len(prefix)
+            for start in range(0, size, DATA_URL_CHUNK):
+                encoded = pybase64.b64encode(mapped[start:start + DATA_URL_CHUNK])
+                out[pos:pos + len(encoded)] = encoded
+                pos += len(encoded)
+    return out.decode('ascii')
+
+
+class GameGenerator:
+    """
+    Orchestrates the complete pipeline from assets to playable game
+    """
+
+    def __init__(
+        self,
+        output_dir: str = "generated_game",
+        vision_max_tokens: int = 8192,
+        thinking_budget: int = 4096
+    ):
+        """
+        Initialize game generator
+
+        Args:
+            output_dir: Directory where game files will be saved
+            vision_max_tokens: max_tokens for the platform Vision calls (thinking + reply)
+            thinking_budget: Extended-thinking budget_tokens for detection and self-reflection;
+                             a call cut off at max_tokens is retried once with both doubled
+        """
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(exist_ok=True)
+        self.vision_max_tokens = vision_max_tokens
+        self.thinking_budget = thinking_budget
+
+        # Processed sprites and copied assets; created once here instead of per step
+        self.assets_dir = self.output_dir / "assets"
+        self.assets_dir.mkdir(exist_ok=True)
+
+        # Exact-match cache of platform analyses, keyed on image bytes + prompt + model.
+        # index.json maps each entry to its pHash for near-duplicate lookups (LRU order)
+        self._platform_cache_dir = self.output_dir / ".platform_cache"
+        self._platform_cache_dir.mkdir(exist_ok=True)
+        self._platform_index_path = self._platform_cache_dir / "index.json"
+        self._platform_index = None
+        self._platform_index_lock = threading.Lock()  # analyze_many runs analyses in threads
+
+        # Processed sprite sheets (PNG + frame sidecar), keyed on sprite bytes + frame count
+        self._sprite_cache_dir = self.output_dir / ".sprite_cache"
+        self._sprite_cache_dir.mkdir(exist_ok=True)
+
+        # Only read .env when the key isn't already in the environment
+        if not os.environ.get("ANTHROPIC_API_KEY"):
+            from dotenv import load_dotenv
+            load_dotenv()
+
+        # GAMEGEN_DEBUG=1 keeps the reasoning logs and detection overlay on disk for inspection
+        self.debug = os.getenv("GAMEGEN_DEBUG", "0") not in ("", "0")
+
+        # Processing modules and the Anthropic client are built on first access
+        self._bg_remover = None
+        self._sprite_builder = None
+        self._bg_analyzer = None
+        self._scene_gen = None
+        self._web_exporter = None
+        self._anthropic_client = None
+        self._sprite_analyzer = None
+
+    @staticmethod
+    def _require_api_key() -> str:
+        """Return ANTHROPIC_API_KEY, raising ValueError if it isn't set"""
+        api_key = os.getenv("ANTHROPIC_API_KEY")
+        if not api_key:
+            raise ValueError("ANTHROPIC_API_KEY required for platform detection. Set it in your .env file.")
+        return api_key
+
+    @property
+    def anthropic_client(self):
+        """Anthropic client for VLM analysis (required for platform detection)"""
+        if self._anthropic_client is None:
+            import anthropic
+            self._anthropic_client = anthropic.Anthropic(
+                api_key=self._require_api_key(),
+                http_client=get_http_client()
+            )
+        return self._anthropic_client
+
+    @anthropic_client.setter
+    def anthropic_client(self, client):
+        self._anthropic_client = client
+
+    @property
+    def sprite_analyzer(self):
+        """Sprite sheet layout analyzer (uses Claude Vision)"""
+        if self._sprite_analyzer is None:
+            from sprite_processing.sprite_sheet_analyzer import SpriteSheetAnalyzer
+            self._sprite_analyzer = SpriteSheetAnalyzer(
+                api_key=self._require_api_key(),
+                http_client=get_http_client()
+            )
+        return self._sprite_analyzer
+
+    @property
+    def bg_remover(self):
+        if self._bg_remover is None:
+            from sprite_processing.background_remover import BackgroundRemover
+            self._bg_remover = BackgroundRemover()
+        return self._bg_remover
+
+    @property
+    def sprite_builder(self):
+        if self._sprite_builder is None:
+            from sprite_processing.sprite_sheet_builder import SpriteSheetBuilder
+            self._sprite_builder = SpriteSheetBuilder()
+        return self._sprite_builder
+
+    @property
+    def bg_analyzer(self):
+        if self._bg_analyzer is None:
+            from scene_builder.background_analyzer import BackgroundAnalyzer
+            self._bg_analyzer = BackgroundAnalyzer()
+        return self._bg_analyzer
+
+    @property
+    def scene_gen(self):
+        if self._scene_gen is None:
+            from scene_builder.scene_generator import SceneGenerator
+            self._scene_gen = SceneGenerator()
+        return self._scene_gen
+
+    @property
+    def web_exporter(self):
+        if self._web_exporter is None:
+            from scene_builder.web_exporter import WebGameExporter
+            self._web_exporter = WebGameExporter()
+        return self._web_exporter
+
+    def analyze_walkable_platforms(self, background_path: Path, no_cache: bool = False) -> Dict[str, Any]:
+        """
+        Use VLM (Claude Sonnet 4.5) with extended thinking to identify walkable platforms.
+
+        Features:
+        - Extended thinking mode for complex reasoning about platform detection
+        - Detailed prompting for reliable JSON responses
+        - Comprehensive validation and error handling
+
+        Args:
+            background_path: Path to background image
+            no_cache: Skip the exact and near-duplicate cache lookups and always call
+                      Claude (the fresh result still replaces the cached one)
+
+        Returns:
+            Dictionary with platform data, gaps, and spawn point
+        """
+        logger.info(f"\n🔍 Analyzing walkable platforms with Claude Vision API...")
+        logger.info(f"  Features: Extended Thinking + JSON Prompting")
+        logger.info(f"  Background: {background_path.name}")
+
+        request = self._prepare_platform_request(background_path, no_cache)
+        if "cached" in request:
+            return request["cached"]
+        if "detected" in request:
+            return self._complete_platform_analysis(request, request["detected"])
+
+        # Call Claude Vision API with extended thinking (no forced tool choice)
+        logger.info(f"  Calling Claude Sonnet 4.5 with extended thinking...")
+
+        response = self._stream_vision_call(**self._platform_request_params(request))
+
+        return self._finish_platform_analysis(request, response)
+
+    def _prepare_platform_request(self, background_path: Path, no_cache: bool = False) -> Dict[str, Any]:
+        """
+        Cache lookups and upload encoding for one platform analysis
+
+        Args:
+            background_path: Path to background image
+            no_cache: Skip the exact and near-duplicate cache lookups
+
+        Returns:
+            {"cached": analysis} on a cache hit; the request state plus {"detected": analysis}
+            when an earlier run checkpointed its detection (only the review step is left);
+            otherwise the per-image request state consumed by _platform_request_params and
+            _finish_platform_analysis
+        """
+        # Load and encode image
+        from PIL import Image
+
+        png_bytes = background_path.read_bytes()
+        img = Image.open(io.BytesIO(png_bytes))
+        width, height = img.size
+        logger.info(f"  Dimensions: {width}x{height}px")
+
+        # Claude downsizes large images anyway - send a capped copy and scale results back
+        sent_width, sent_height = _vision_dimensions(width, height)
+
+        # Create vision analysis prompt: the static instructions are cached server-side,
+        # only this short per-image note is billed in full on every call
+        image_note = f"The background image is {sent_width}x{sent_height}px."
+
+        # Same image, prompt and model -> reuse the stored analysis instead of calling the API
+        cache_key = hashlib.sha256(
+            png_bytes + PLATFORM_PROMPT.encode() + image_note.encode() + VISION_MODEL.encode()
+        ).hexdigest()
+        cache_path = self._platform_cache_dir / f"{cache_key}.json"
+        if not no_cache and cache_path.exists():
+            logger.info(f"  ✓ Platform analysis cache hit ({cache_key[:12]})")
+            self._update_platform_index(cache_key)
+            return {"cached": orjson.loads(cache_path.read_bytes())}
+
+        # No exact match -> look for a visually near-identical background analyzed under
+        # the same prompt, model and dimensions (so coordinates still line up)
+        phash = _perceptual_hash(img)
+        context = hashlib.sha256(
+            PLATFORM_PROMPT.encode() + image_note.encode() + VISION_MODEL.encode()
+            + f"{width}x{height}".encode()
+        ).hexdigest()[:16]
+        similar_key = None if no_cache else self._find_similar_platform_analysis(phash, context)
+        if similar_key is not None:
+            logger.info(f"  ✓ Platform analysis near-duplicate cache hit ({similar_key[:12]})")
+            self._update_platform_index(similar_key)
+            return {"cached": orjson.loads((self._platform_cache_dir / f"{similar_key}.json").read_bytes())}
+
+        # An earlier run got through detection but failed later: resume at the review step
+        checkpoint_path = self._platform_cache_dir / f"{cache_key}.detected.json"
+        if not no_cache and checkpoint_path.exists():
+            logger.info(f"  ✓ Resuming from checkpointed detection ({cache_key[:12]})")
+            return {
+                "background_path": background_path,
+                "width": width,
+                "height": height,
+                "cache_key": cache_key,
+                "phash": phash,
+                "context": context,
+                "detected": orjson.loads(checkpoint_path.read_bytes()),
+            }
+
+        # Convert image to base64 for Claude API
+        if (sent_width, sent_height) == (width, height) and img.format == 'PNG':
+            # Source is already an upload-ready PNG - Image.open only read its header
+            upload_bytes, media_type = png_bytes, "image/png"
+        else:
+            # Same decoded copy the self-reflection overlay is drawn on right after
+            img = _vision_background(background_path)[0]
+            if (sent_width, sent_height) != (width, height):
+                logger.info(f"  Downscaled to {sent_width}x{sent_height}px for upload")
+            upload_bytes, media_type = _vision_upload(img)
+        img_base64 = pybase64.standard_b64encode(upload_bytes).decode('ascii')
+
+        return {
+            "background_path": background_path,
+            "width": width,
+            "height": height,
+            "sent_width": sent_width,
+            "sent_height": sent_height,
+            "image_note": image_note,
+            "media_type": media_type,
+            "img_base64": img_base64,
+            "cache_key": cache_key,
+            "phash": phash,
+            "context": context,
+        }
+
+    @staticmethod
+    def _platform_request_messages(request: Dict[str, Any], note_suffix: str = "") -> List[Dict[str, Any]]:
+        """User message for a platform detection call: image, then the size note"""
+        return [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "image",
+                        "source": {
+                            "type": "base64",
+                            "media_type": request["media_type"],
+                            "data": request["img_base64"]
                         }
                     },
-                    "required": ["platforms", "gaps", "spawn", "notes"]
-                }
+                    {
+                        "type": "text",
+                        "text": request["image_note"] + note_suffix
+                    }
+                ]
             }
         ]
 
-        # Call Claude Vision API with extended thinking (no forced tool choice)
-        print(f"  Calling Claude Sonnet 4.5 with extended thinking...")
-
-        response = self.anthropic_client.messages.create(
-            model="claude-sonnet-4-5",
-            max_tokens=16000,  # Increased for thinking + response
-            thinking={
+    def _platform_request_params(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Messages API parameters for the extended-thinking platform detection call"""
+        return {
+            "model": VISION_MODEL,
+            "max_tokens": self.vision_max_tokens,
+            "thinking": {
                 "type": "enabled",
-                "budget_tokens": 10000  # Allow substantial reasoning
+                "budget_tokens": self.thinking_budget
             },
-            tools=tools,
+            "system": PLATFORM_SYSTEM,
+            "tools": PLATFORM_TOOLS,
             # NO tool_choice with thinking mode - can't force tool calls
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": "image/png",
-                                "data": img_base64
-                            }
-                        },
-                        {
-                            "type": "text",
-                            "text": prompt
-                        }
-                    ]
-                }
-            ]
+            "messages": self._platform_request_messages(request),
+        }
+
+    def _stream_vision_call(self, **params) -> Any:
+        """
+        Streamed Messages API call for the extended-thinking Vision requests
+
+        Streamed because thinking runs for tens of seconds and an event stream keeps the
+        connection active instead of idling on one long read; get_final_message() returns
+        the same Message that create() would. A reply cut off at max_tokens is retried
+        once with max_tokens and the thinking budget doubled.
+        """
+        with self.anthropic_client.messages.stream(**params) as stream:
+            response = stream.get_final_message()
+        self._log_usage(response)
+
+        if response.stop_reason == "max_tokens":
+            logger.warning(f"  ⚠️  Hit max_tokens={params['max_tokens']}, retrying with double the budget...")
+            params = {
+                **params,
+                "max_tokens": params["max_tokens"] * 2,
+                "thinking": {**params["thinking"], "budget_tokens": params["thinking"]["budget_tokens"] * 2},
+            }
+            with self.anthropic_client.messages.stream(**params) as stream:
+                response = stream.get_final_message()
+            self._log_usage(response)
+
+        return response
+
+    @staticmethod
+    def _log_usage(response):
+        """Log token usage of a Vision call (for tuning vision_max_tokens / thinking_budget)"""
+        usage = response.usage
+        logger.info(
+            f"  Tokens: {usage.input_tokens} in (+{usage.cache_read_input_tokens or 0} cache read), "
+            f"{usage.output_tokens} out, stop: {response.stop_reason}"
         )
 
+    def _finish_platform_analysis(self, request: Dict[str, Any], response) -> Dict[str, Any]:
+        """
+        Turn a platform detection response into the final, cached analysis
+
+        Re-prompts once without thinking if no tool call came back, maps coordinates to
+        the original resolution, validates the spawn point, runs self-reflection and
+        stores the result.
+
+        Args:
+            request: State from _prepare_platform_request
+            response: Message returned for _platform_request_params(request)
+
+        Returns:
+            Dictionary with platform data, gaps, and spawn point
+        """
+        width, height = request["width"], request["height"]
+
         # Extract thinking blocks and tool use
         thinking_content = []
         tool_input = None
@@ -325,54 +903,39 @@ Now analyze the image and return your analysis in the structured format."""
         for block in response.content:
             if block.type == "thinking":
                 thinking_content.append(block.thinking)
-                print(f"  🧠 Claude's reasoning: {block.thinking[:200]}...")  # Show first 200 chars
+                logger.info(f"  🧠 Claude's reasoning: {block.thinking[:200]}...")  # Show first 200 chars
             elif block.type == "tool_use":
                 tool_input = block.input
-                print(f"  ✓ Tool called: {block.name}")
+                logger.info(f"  ✓ Tool called: {block.name}")
 
         # Log full thinking to file for analysis
-        if thinking_content:
+        if thinking_content and self.debug:
             thinking_log_path = self.output_dir / "platform_detection_thinking.txt"
             with open(thinking_log_path, 'w') as f:
                 f.write("=== CLAUDE'S REASONING FOR PLATFORM DETECTION ===\n\n")
                 f.write('\n\n'.join(thinking_content))
-            print(f"  ✓ Reasoning saved to: {thinking_log_path.name}")
+            logger.info(f"  ✓ Reasoning saved to: {thinking_log_path.name}")
 
         # If no tool call was made (can happen with thinking mode), re-prompt without thinking
         if tool_input is None:
-            print(f"  ⚠️  No tool call detected, re-prompting without thinking mode...")
+            logger.warning(f"  ⚠️  No tool call detected, re-prompting without thinking mode...")
 
             retry_response = self.anthropic_client.messages.create(
-                model="claude-sonnet-4-5",
-                max_tokens=16000,
-                tools=tools,
+                model=VISION_MODEL,
+                max_tokens=self.vision_max_tokens,
+                system=PLATFORM_SYSTEM,
+                tools=PLATFORM_TOOLS,
                 tool_choice={"type": "tool", "name": "report_platform_analysis"},
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "image",
-                                "source": {
-                                    "type": "base64",
-                                    "media_type": "image/png",
-                                    "data": img_base64
-                                }
-                            },
-                            {
-                                "type": "text",
-                                "text": prompt + "\n\nPlease make a tool call with your analysis."
-                            }
-                        ]
-                    }
-                ]
+                messages=self._platform_request_messages(
+                    request, "\n\nPlease make a tool call with your analysis."
+                )
             )
 
             # Extract tool use from retry
             for block in retry_response.content:
                 if block.type == "tool_use":
                     tool_input = block.input
-                    print(f"  ✓ Tool called on retry: {block.name}")
+                    logger.info(f"  ✓ Tool called on retry: {block.name}")
                     break
 
             if tool_input is None:
@@ -381,207 +944,256 @@ Now analyze the image and return your analysis in the structured format."""
         # Extract structured data from tool use
         analysis_data = tool_input
 
+        # Map coordinates from the uploaded copy back to the original image
+        if request["sent_width"] != width or request["sent_height"] != height:
+            self._scale_analysis_coordinates(
+                analysis_data, width / request["sent_width"], height / request["sent_height"]
+            )
+
         # Add image dimensions
         analysis_data["width"] = width
         analysis_data["height"] = height
 
-        print(f"  ✓ Found {len(analysis_data['platforms'])} walkable platforms")
-        print(f"  ✓ Identified {len(analysis_data['gaps'])} gaps requiring jumps")
-        print(f"  ✓ Spawn point: ({analysis_data['spawn']['x']}, {analysis_data['spawn']['y']})")
+        logger.info(f"  ✓ Found {len(analysis_data['platforms'])} walkable platforms")
+        logger.info(f"  ✓ Identified {len(analysis_data['gaps'])} gaps requiring jumps")
+        logger.info(f"  ✓ Spawn point: ({analysis_data['spawn']['x']}, {analysis_data['spawn']['y']})")
 
         # Validate and fix spawn point to ensure it's on a platform
         analysis_data = self._validate_spawn_point(analysis_data)
 
+        # Checkpoint the detection so a failure in the review step doesn't cost this call again
+        self._write_platform_cache_file(f"{request['cache_key']}.detected.json", analysis_data)
+
+        return self._complete_platform_analysis(request, analysis_data)
+
+    def _complete_platform_analysis(self, request: Dict[str, Any], analysis_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Self-reflection and caching for a detected (and spawn-validated) analysis
+
+        Args:
+            request: State from _prepare_platform_request
+            analysis_data: Detection at original image coordinates
+
+        Returns:
+            Final analysis, also stored in the platform cache
+        """
+        width, height = request["width"], request["height"]
+
         # Self-reflection: Have Claude review its own detections
-        print(f"\n🔄 Self-reflection: Claude reviewing its detections...")
+        logger.info(f"\n🔄 Self-reflection: Claude reviewing its detections...")
         analysis_data = self._self_reflect_on_detections(
-            background_path,
+            request["background_path"],
             analysis_data,
             width,
             height
         )
 
+        self._write_platform_cache_file(f"{request['cache_key']}.json", analysis_data)
+        (self._platform_cache_dir / f"{request['cache_key']}.detected.json").unlink(missing_ok=True)
+        self._update_platform_index(
+            request["cache_key"], {"phash": f"{request['phash']:x}", "context": request["context"]}
+        )
+
         return analysis_data
 
-    def verify_platform_detections(
-        self,
-        background_path: Path,
-        initial_analysis: Dict[str, Any]
-    ) -> Dict[str, Any]:
+    def _write_platform_cache_file(self, name: str, data: Dict[str, Any]):
+        """Write a platform cache file via a temp file so an interrupted run never leaves a truncated one"""
+        atomic_write_bytes(self._platform_cache_dir / name, orjson.dumps(data))
+
+    def _load_platform_index(self) -> Dict[str, Dict[str, str]]:
+        """Load the pHash index of the platform cache (cache_key -> phash/context), oldest first"""
+        if self._platform_index is None:
+            try:
+                self._platform_index = orjson.loads(self._platform_index_path.read_bytes())
+            except (FileNotFoundError, orjson.JSONDecodeError):
+                self._platform_index = {}
+        return self._platform_index
+
+    def _find_similar_platform_analysis(self, phash: int, context: str) -> Optional[str]:
         """
-        Verify platform detections by showing Claude an overlay of its initial detections
-        and asking it to correct them, focusing only on walkable surfaces.
+        Find a cached analysis whose background is perceptually near-identical
 
         Args:
-            background_path: Path to background image
-            initial_analysis: Initial platform analysis from Claude
+            phash: Perceptual hash of the incoming background
+            context: Digest of prompt, model and image dimensions the entry must share
 
         Returns:
-            Verified/corrected platform analysis
+            Cache key of the closest entry within PHASH_MAX_DISTANCE bits, or None
         """
-        import base64
-        import io
-        from PIL import ImageDraw
-
-        # Load background
-        img = Image.open(background_path).convert('RGBA')
-        width, height = img.size
-
-        # Create overlay with detected platforms
-        overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(overlay)
+        best_key, best_distance = None, PHASH_MAX_DISTANCE + 1
+        with self._platform_index_lock:
+            for key, entry in self._load_platform_index().items():
+                if entry["context"] != context:
+                    continue
+                distance = (phash ^ int(entry["phash"], 16)).bit_count()
+                if distance < best_distance and (self._platform_cache_dir / f"{key}.json").exists():
+                    best_key, best_distance = key, distance
+        return best_key
+
+    def _update_platform_index(self, cache_key: str, entry: Optional[Dict[str, str]] = None):
+        """
+        Mark a platform cache entry most recently used, adding it if entry is given
 
-        # Draw initial platform detections
-        for i, platform in enumerate(initial_analysis['platforms']):
-            x = platform['x']
-            y = platform['y']
-            w = platform['width']
-            h = platform['height']
+        Evicts the least recently used analyses beyond PLATFORM_CACHE_MAX_ENTRIES.
+        """
+        with self._platform_index_lock:
+            index = self._load_platform_index()
+            existing = index.pop(cache_key, None)
+            entry = entry or existing
+            if entry is None:
+                return  # Written before the index existed; nothing to hash it by
+            index[cache_key] = entry
+
+            while len(index) > PLATFORM_CACHE_MAX_ENTRIES:
+                evicted = next(iter(index))
+                del index[evicted]
+                (self._platform_cache_dir / f"{evicted}.json").unlink(missing_ok=True)
+
+            atomic_write_bytes(self._platform_index_path, orjson.dumps(index))
+
+    async def analyze_many(
+        self,
+        background_paths: List[Path],
+        max_concurrency: int = 8
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze several backgrounds concurrently (e.g. one character across many levels)
 
-            # Draw semi-transparent green rectangles
-            draw.rectangle(
-                [x, y, x + w, y + h],
-                fill=(0, 255, 0, 80),  # Green with alpha
-                outline=(0, 255, 0, 255),  # Solid green outline
-                width=3
-            )
+        Each analysis runs in a worker thread; the Claude calls share one HTTP/2 connection
+        pool, so up to max_concurrency requests are in flight at once instead of queuing.
+        Per-step progress lines are suppressed while they run; warnings still print.
 
-            # Add platform number
-            label = f"P{i+1}"
-            draw.text((x + 5, y + 5), label, fill=(255, 255, 255, 255))
-
-        # Draw gaps
-        for gap in initial_analysis.get('gaps', []):
-            x = gap.get('x', 0)
-            y = gap.get('y', 0)
-            w = gap.get('width', 0)
-            h = gap.get('height', 0)
-            if w > 0 and h > 0:
-                draw.rectangle(
-                    [x, y, x + w, y + h],
-                    fill=(255, 0, 0, 60),  # Red with alpha
-                    outline=(255, 0, 0, 200),
-                    width=2
-                )
+        Args:
+            background_paths: Paths to background images
+            max_concurrency: Maximum analyses running at the same time
 
-        # Draw spawn point
-        spawn_x = initial_analysis['spawn']['x']
-        spawn_y = initial_analysis['spawn']['y']
-        spawn_radius = 12
-        draw.ellipse(
-            [spawn_x - spawn_radius, spawn_y - spawn_radius,
-             spawn_x + spawn_radius, spawn_y + spawn_radius],
-            fill=(255, 255, 0, 200),
-            outline=(255, 255, 0, 255),
-            width=3
-        )
+        Returns:
+            Platform analyses in the same order as background_paths
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        def analyze_quietly(background_path: Path) -> Dict[str, Any]:
+            # Parallel progress lines would interleave; keep only warnings from this thread
+            _log_state.quiet = True
+            try:
+                return self.analyze_walkable_platforms(background_path)
+            finally:
+                _log_state.quiet = False
+
+        async def analyze(background_path: Path) -> Dict[str, Any]:
+            async with semaphore:
+                return await asyncio.to_thread(analyze_quietly, background_path)
+
+        # Analyze each distinct path once; duplicates share the result
+        unique_paths = list(dict.fromkeys(Path(p) for p in background_paths))
+        results = await asyncio.gather(*(analyze(p) for p in unique_paths))
+        by_path = dict(zip(unique_paths, results))
+        return [by_path[Path(p)] for p in background_paths]
+
+    def analyze_many_batched(
+        self,
+        background_paths: List[Path],
+        poll_interval: float = 30.0
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze several backgrounds with one Message Batches API submission
 
-        # Composite overlay onto background
-        overlay_img = Image.alpha_composite(img, overlay)
-
-        # Convert to base64
-        buffer = io.BytesIO()
-        overlay_img.save(buffer, format='PNG')
-        buffer.seek(0)
-        img_base64 = base64.standard_b64encode(buffer.getvalue()).decode('utf-8')
-
-        # Create verification prompt
-        verification_prompt = f"""You previously analyzed this 2D platformer background ({width}x{height}px) and detected platforms.
-
-I've overlaid your detections on the image:
-- GREEN rectangles = platforms you detected (labeled P1, P2, etc.)
-- RED rectangles = gaps you detected
-- YELLOW circle = spawn point you chose
-
-Please review your detections and provide CORRECTED platform data following these CRITICAL rules:
-
-ONLY DETECT ACTUAL WALKABLE SURFACES:
-- ONLY solid horizontal grass/ground platforms where a character can walk
-- IGNORE all decorative elements (trees, mushrooms, crystals, plants, etc.)
-- Trees and vegetation are NOT platforms - they sit ON platforms
-- Focus on the solid ground/terrain underneath decorations
-- A platform should be a continuous walkable surface (can span full width if ground is continuous)
-
-PLATFORM REQUIREMENTS:
-- Must be wide enough for a character to stand on (minimum ~50px wide)
-- Should capture the full horizontal extent of walkable ground
-- Include ONLY the grass/ground surface layer, not decorations on top
-- If ground is continuous across the bottom, it should be ONE platform
-
-ENSURE FULL LEVEL TRAVERSAL:
-- Player must be able to walk or jump between all platforms
-- Check that platforms allow movement from left edge to right edge of the scene
-- Verify no unreachable areas or impossible gaps
-
-Review the image carefully and return CORRECTED analysis as JSON:
-{{
-  "platforms": [
-    {{"name": "Platform Name", "x": 0, "y": 740, "width": 1024, "height": 28, "walkable": true}},
-    ...
-  ],
-  "gaps": [
-    {{"description": "Gap description", "from_platform": "Platform A", "to_platform": "Platform B", "width": 50, "x": 100, "y": 700, "height": 20}},
-    ...
-  ],
-  "spawn": {{"x": 512, "y": 640}},
-  "corrections_made": ["List any corrections you made from the initial detection"],
-  "notes": ["Important observations about the level layout"]
-}}
-
-Only return the JSON, no other text."""
-
-        # Call Claude Vision with overlay
-        print(f"  Sending overlay to Claude for verification...")
-
-        response = self.anthropic_client.messages.create(
-            model="claude-sonnet-4-5",
-            max_tokens=4096,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": "image/png",
-                                "data": img_base64
-                            }
-                        },
-                        {
-                            "type": "text",
-                            "text": verification_prompt
-                        }
-                    ]
-                }
-            ]
-        )
+        The extended-thinking detection calls for every uncached background go out as a
+        single batch, billed at half the per-call price. Batches complete asynchronously
+        (usually minutes, at most 24h), so this is for offline multi-level generation;
+        request-path callers should keep using analyze_walkable_platforms / analyze_many.
+        Tool-call retries and self-reflection then run per background as usual.
 
-        # Parse verified response
-        response_text = response.content[0].text.strip()
+        Args:
+            background_paths: Paths to background images
+            poll_interval: Seconds between batch status checks
 
-        # Remove markdown code fences if present
-        if response_text.startswith("```"):
-            lines = response_text.split('\n')
-            if lines[0].startswith("```"):
-                lines = lines[1:]
-            if lines and lines[-1].strip() == "```":
-                lines = lines[:-1]
-            response_text = '\n'.join(lines).strip()
+        Returns:
+            Platform analyses in the same order as background_paths
+        """
+        # Analyze each distinct path once; duplicates share the result
+        unique_paths = list(dict.fromkeys(Path(p) for p in background_paths))
+        by_path = {}
+        pending = {}
+        for i, background_path in enumerate(unique_paths):
+            request = self._prepare_platform_request(background_path)
+            if "cached" in request:
+                by_path[background_path] = request["cached"]
+            elif "detected" in request:
+                by_path[background_path] = self._complete_platform_analysis(request, request["detected"])
+            else:
+                pending[f"background-{i}"] = request
+
+        # A lone miss gains nothing from batch queueing; it takes the direct path below
+        if len(pending) > 1:
+            batch = self.anthropic_client.messages.batches.create(requests=[
+                {"custom_id": custom_id, "params": self._platform_request_params(request)}
+                for custom_id, request in pending.items()
+            ])
+            logger.info(f"  📨 Submitted platform detection batch {batch.id} ({len(pending)} backgrounds)")
+            while batch.processing_status != "ended":
+                time.sleep(poll_interval)
+                batch = self.anthropic_client.messages.batches.retrieve(batch.id)
+
+            for entry in self.anthropic_client.messages.batches.results(batch.id):
+                if entry.result.type != "succeeded":
+                    logger.warning(f"  ⚠️  Batch entry {entry.custom_id} {entry.result.type}, retrying directly")
+                    continue
+                request = pending.pop(entry.custom_id)
+                self._log_usage(entry.result.message)
+                by_path[request["background_path"]] = self._finish_platform_analysis(request, entry.result.message)
+
+        # Errored or expired batch entries (and a single miss) use the regular streamed call
+        for request in pending.values():
+            response = self._stream_vision_call(**self._platform_request_params(request))
+            by_path[request["background_path"]] = self._finish_platform_analysis(request, response)
+
+        return [by_path[Path(p)] for p in background_paths]
+
+    @classmethod
+    def _scaled_detections(cls, analysis_data: Dict[str, Any], scale_x: float, scale_y: float) -> Dict[str, Any]:
+        """Copy of the platforms, gaps and spawn point with coordinates scaled by the factors"""
+        scaled = {
+            "platforms": [dict(platform) for platform in analysis_data["platforms"]],
+            "gaps": [dict(gap) for gap in analysis_data.get("gaps", [])],
+            "spawn": dict(analysis_data["spawn"]),
+        }
+        cls._scale_analysis_coordinates(scaled, scale_x, scale_y)
+        return scaled
+
+    @staticmethod
+    def _scale_analysis_coordinates(analysis_data: Dict[str, Any], scale_x: float, scale_y: float):
+        """Scale platform, gap and spawn coordinates in place by the given factors"""
+        for item in analysis_data.get("platforms", []) + analysis_data.get("gaps", []):
+            for key, factor in (("x", scale_x), ("width", scale_x), ("y", scale_y), ("height", scale_y)):
+                if key in item:
+                    item[key] = round(item[key] * factor)
+        spawn = analysis_data.get("spawn")
+        if spawn:
+            spawn["x"] = round(spawn["x"] * scale_x)
+            spawn["y"] = round(spawn["y"] * scale_y)
 
-        verified_data = json.loads(response_text)
+    def verify_platform_detections(
+        self,
+        background_path: Path,
+        initial_analysis: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Verify platform detections by showing Claude an overlay of its initial detections
+        and asking it to correct them.
 
-        # Add image dimensions
-        verified_data["width"] = width
-        verified_data["height"] = height
+        Runs the same overlay review as the self-reflection step of
+        analyze_walkable_platforms, so there is one review prompt and tool schema.
 
-        print(f"  ✓ Verified: {len(verified_data['platforms'])} platforms (was {len(initial_analysis['platforms'])})")
-        if verified_data.get('corrections_made'):
-            print(f"  ✓ Corrections made:")
-            for correction in verified_data['corrections_made']:
-                print(f"    - {correction}")
+        Args:
+            background_path: Path to background image
+            initial_analysis: Initial platform analysis from Claude
 
-        return verified_data
+        Returns:
+            Verified/corrected platform analysis
+        """
+        _, width, height = _vision_background(background_path)
+        return self._self_reflect_on_detections(background_path, initial_analysis, width, height)
 
     def _self_reflect_on_detections(
         self,
@@ -608,17 +1220,20 @@ Only return the JSON, no other text."""
         Returns:
             Refined analysis if changes needed, otherwise original analysis
         """
-        import base64
-        import io
-        from PIL import ImageDraw, ImageFont
+        from PIL import ImageDraw
 
-        # Create visualization of detections
-        img = Image.open(background_path).convert('RGBA')
-        overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(overlay)
+        # Create visualization of detections at upload size (drawn in that pixel space;
+        # refined coordinates are scaled back to the original afterwards)
+        img = _vision_background(background_path)[0]
+        sent_width, sent_height = img.size
+        shown = initial_analysis
+        if (sent_width, sent_height) != (width, height):
+            shown = self._scaled_detections(initial_analysis, sent_width / width, sent_height / height)
+        composite_img = img.convert('RGB')
+        draw = ImageDraw.Draw(composite_img, 'RGBA')  # Blends fills in place, no overlay pass
 
         # Draw detected platforms
-        for i, platform in enumerate(initial_analysis['platforms']):
+        for i, platform in enumerate(shown['platforms']):
             x, y, w, h = platform['x'], platform['y'], platform['width'], platform['height']
 
             # Draw platform as thin horizontal line (representing top surface)
@@ -634,7 +1249,7 @@ Only return the JSON, no other text."""
             draw.text((x + 5, y - 15), label, fill=(255, 255, 255, 255))
 
         # Draw spawn point
-        spawn_x, spawn_y = initial_analysis['spawn']['x'], initial_analysis['spawn']['y']
+        spawn_x, spawn_y = shown['spawn']['x'], shown['spawn']['y']
         draw.ellipse(
             [spawn_x - 15, spawn_y - 15, spawn_x + 15, spawn_y + 15],
             fill=(255, 255, 0, 200),
@@ -643,143 +1258,37 @@ Only return the JSON, no other text."""
         )
         draw.text((spawn_x + 20, spawn_y - 10), "SPAWN", fill=(255, 255, 255, 255))
 
-        # Composite and encode
-        composite_img = Image.alpha_composite(img, overlay)
-        buffer = io.BytesIO()
-        composite_img.save(buffer, format='PNG')
-        img_base64 = base64.standard_b64encode(buffer.getvalue()).decode('utf-8')
-
-        # Save visualization for debugging
-        viz_path = self.output_dir / "platform_detections_visualization.png"
-        composite_img.save(viz_path)
-        print(f"  ✓ Visualization saved: {viz_path.name}")
-
-        # Self-reflection prompt
-        reflection_prompt = f"""You previously analyzed this platformer background and detected {len(initial_analysis['platforms'])} platforms.
-
-I've visualized your detections:
-- GREEN boxes = platforms you detected (labeled P1, P2, etc.)
-- YELLOW circle = spawn point
-
-CRITICAL REVIEW QUESTIONS:
-
-1. **Platform Tops**: Do the green boxes represent just the THIN WALKABLE TOPS of platforms (10-20px high)?
-   - If any platforms show full bodies instead of just tops, they need refinement
-
-2. **Accessibility**: Can the player REACH all detected platforms from spawn by walking/jumping?
-   - Check each platform: Is it reachable via a connected path?
-   - Exclude any floating platforms with no access
-   - Maximum jump height: ~300px vertical
-
-3. **Completeness**: Are there any ACCESSIBLE walkable surfaces you missed?
-   - Look for platforms the player can reach but weren't detected
-
-4. **Accuracy**: Are all coordinates precise?
-   - Check that Y values match the actual top surface
-   - Verify widths span the full walkable extent
-
-Based on your review, choose ONE of these actions:
-
-A) **DETECTIONS ARE GOOD** - No changes needed, current detections are accurate and complete
-B) **REFINEMENTS NEEDED** - Provide updated platform data with corrections
-
-Return your response as JSON:
-{{
-  "reflection": {{
-    "decision": "GOOD" or "REFINE",
-    "reasoning": "Explain your decision in 2-3 sentences",
-    "issues_found": ["List specific issues if any", "..."],
-    "changes_made": ["List changes if refining", "..."]
-  }},
-  "platforms": [...],  // Updated platforms if REFINE, otherwise same as before
-  "gaps": [...],
-  "spawn": {{"x": ..., "y": ...}},
-  "notes": [...]
-}}
-
-Be critical and thorough. If detections aren't perfect, refine them!"""
-
-        # Define tool for reflection
-        tools = [
-            {
-                "name": "report_reflection_result",
-                "description": "Report the reflection decision and refined platform detections",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "reflection": {
-                            "type": "object",
-                            "properties": {
-                                "decision": {"type": "string", "enum": ["GOOD", "REFINE"], "description": "Whether detections are good or need refinement"},
-                                "reasoning": {"type": "string", "description": "Explanation of the decision"},
-                                "issues_found": {"type": "array", "items": {"type": "string"}, "description": "List of issues found"},
-                                "changes_made": {"type": "array", "items": {"type": "string"}, "description": "List of changes made if refining"}
-                            },
-                            "required": ["decision", "reasoning", "issues_found", "changes_made"]
-                        },
-                        "platforms": {
-                            "type": "array",
-                            "description": "Updated or confirmed platform list",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "name": {"type": "string"},
-                                    "x": {"type": "integer"},
-                                    "y": {"type": "integer"},
-                                    "width": {"type": "integer"},
-                                    "height": {"type": "integer"},
-                                    "walkable": {"type": "boolean"}
-                                },
-                                "required": ["name", "x", "y", "width", "height", "walkable"]
-                            }
-                        },
-                        "gaps": {"type": "array", "items": {"type": "object"}},
-                        "spawn": {
-                            "type": "object",
-                            "properties": {
-                                "x": {"type": "integer"},
-                                "y": {"type": "integer"}
-                            },
-                            "required": ["x", "y"]
-                        },
-                        "notes": {"type": "array", "items": {"type": "string"}}
-                    },
-                    "required": ["reflection", "platforms", "gaps", "spawn", "notes"]
-                }
-            }
-        ]
+        # Encode
+        upload_bytes, media_type = _vision_upload(composite_img)
+        img_base64 = pybase64.standard_b64encode(upload_bytes).decode('ascii')
+
+        # Save visualization for debugging (reuse the bytes encoded above)
+        if self.debug:
+            viz_suffix = ".jpg" if media_type == "image/jpeg" else ".png"
+            viz_path = self.output_dir / f"platform_detections_visualization{viz_suffix}"
+            viz_path.write_bytes(upload_bytes)
+            logger.info(f"  ✓ Visualization saved: {viz_path.name}")
+
+        # Per-image part of the reflection prompt (REFLECTION_PROMPT itself is static)
+        reflection_note = (
+            f"The background image is {sent_width}x{sent_height}px and you detected "
+            f"{len(initial_analysis['platforms'])} platforms."
+        )
 
         # Call Claude for self-reflection with extended thinking (no forced tool choice)
-        print(f"  Asking Claude to review its detections...")
+        logger.info(f"  Asking Claude to review its detections...")
 
-        response = self.anthropic_client.messages.create(
-            model="claude-sonnet-4-5",
-            max_tokens=16000,
+        response = self._stream_vision_call(
+            model=VISION_MODEL,
+            max_tokens=self.vision_max_tokens,
             thinking={
                 "type": "enabled",
-                "budget_tokens": 8000
+                "budget_tokens": self.thinking_budget
             },
-            tools=tools,
+            system=REFLECTION_SYSTEM,
+            tools=REFLECTION_TOOLS,
             # NO tool_choice with thinking mode - can't force tool calls
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": "image/png",
-                                "data": img_base64
-                            }
-                        },
-                        {
-                            "type": "text",
-                            "text": reflection_prompt
-                        }
-                    ]
-                }
-            ]
+            messages=self._reflection_messages(media_type, img_base64, reflection_note)
         )
 
         # Extract reflection thinking and tool use
@@ -789,54 +1298,40 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
         for block in response.content:
             if block.type == "thinking":
                 thinking_content.append(block.thinking)
-                print(f"  🧠 Reflection: {block.thinking[:150]}...")
+                logger.info(f"  🧠 Reflection: {block.thinking[:150]}...")
             elif block.type == "tool_use":
                 tool_input = block.input
-                print(f"  ✓ Reflection tool called: {block.name}")
+                logger.info(f"  ✓ Reflection tool called: {block.name}")
 
         # Save reflection thinking
-        if thinking_content:
+        if thinking_content and self.debug:
             reflection_log_path = self.output_dir / "platform_reflection_thinking.txt"
             with open(reflection_log_path, 'w') as f:
                 f.write("=== CLAUDE'S SELF-REFLECTION ON DETECTIONS ===\n\n")
                 f.write('\n\n'.join(thinking_content))
-            print(f"  ✓ Reflection thinking saved: {reflection_log_path.name}")
+            logger.info(f"  ✓ Reflection thinking saved: {reflection_log_path.name}")
 
         # If no tool call was made (can happen with thinking mode), re-prompt without thinking
         if tool_input is None:
-            print(f"  ⚠️  No tool call detected in reflection, re-prompting without thinking mode...")
+            logger.warning(f"  ⚠️  No tool call detected in reflection, re-prompting without thinking mode...")
 
             retry_response = self.anthropic_client.messages.create(
-                model="claude-sonnet-4-5",
-                max_tokens=16000,
-                tools=tools,
+                model=VISION_MODEL,
+                max_tokens=self.vision_max_tokens,
+                system=REFLECTION_SYSTEM,
+                tools=REFLECTION_TOOLS,
                 tool_choice={"type": "tool", "name": "report_reflection_result"},
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "image",
-                                "source": {
-                                    "type": "base64",
-                                    "media_type": "image/png",
-                                    "data": img_base64
-                                }
-                            },
-                            {
-                                "type": "text",
-                                "text": reflection_prompt + "\n\nPlease make a tool call with your reflection results."
-                            }
-                        ]
-                    }
-                ]
+                messages=self._reflection_messages(
+                    media_type, img_base64,
+                    reflection_note + "\n\nPlease make a tool call with your reflection results."
+                )
             )
 
             # Extract tool use from retry
             for block in retry_response.content:
                 if block.type == "tool_use":
                     tool_input = block.input
-                    print(f"  ✓ Reflection tool called on retry: {block.name}")
+                    logger.info(f"  ✓ Reflection tool called on retry: {block.name}")
                     break
 
             if tool_input is None:
@@ -850,18 +1345,18 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
         issues = reflection_result['reflection']['issues_found']
         changes = reflection_result['reflection']['changes_made']
 
-        print(f"\n  Decision: {decision}")
-        print(f"  Reasoning: {reasoning}")
+        logger.info(f"\n  Decision: {decision}")
+        logger.info(f"  Reasoning: {reasoning}")
 
         if issues:
-            print(f"  Issues found:")
+            logger.info(f"  Issues found:")
             for issue in issues:
-                print(f"    - {issue}")
+                logger.info(f"    - {issue}")
 
         if decision == "REFINE":
-            print(f"  ✓ Applying refinements:")
+            logger.info(f"  ✓ Applying refinements:")
             for change in changes:
-                print(f"    - {change}")
+                logger.info(f"    - {change}")
 
             # Use refined detections
             refined_data = {
@@ -872,13 +1367,38 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
                 "width": width,
                 "height": height
             }
+            if (sent_width, sent_height) != (width, height):
+                self._scale_analysis_coordinates(refined_data, width / sent_width, height / sent_height)
 
-            print(f"  ✓ Refined: {len(refined_data['platforms'])} platforms (was {len(initial_analysis['platforms'])})")
+            logger.info(f"  ✓ Refined: {len(refined_data['platforms'])} platforms (was {len(initial_analysis['platforms'])})")
             return refined_data
         else:
-            print(f"  ✓ Detections confirmed as accurate")
+            logger.info(f"  ✓ Detections confirmed as accurate")
             return initial_analysis
 
+    @staticmethod
+    def _reflection_messages(media_type: str, img_base64: str, note: str) -> List[Dict[str, Any]]:
+        """User message for the self-reflection call: overlay image, then the per-image note"""
+        return [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "image",
+                        "source": {
+                            "type": "base64",
+                            "media_type": media_type,
+                            "data": img_base64
+                        }
+                    },
+                    {
+                        "type": "text",
+                        "text": note
+                    }
+                ]
+            }
+        ]
+
     def _validate_spawn_point(self, analysis_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Validate that the spawn point is on a platform and adjust if necessary.
@@ -896,7 +1416,7 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
         spawn_y = analysis_data['spawn']['y']
 
         if not platforms:
-            print(f"  ⚠️  WARNING: No platforms detected! Using original spawn point.")
+            logger.warning(f"  ⚠️  WARNING: No platforms detected! Using original spawn point.")
             return analysis_data
 
         # Check if spawn point is on a platform
@@ -912,34 +1432,29 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
             return on_platform_x and on_platform_y
 
         # Find which platform the spawn point is on
-        spawn_platform = None
-        for platform in platforms:
-            if is_on_platform(spawn_x, spawn_y, platform):
-                spawn_platform = platform
-                break
+        spawn_platform = next((p for p in platforms if is_on_platform(spawn_x, spawn_y, p)), None)
 
         if spawn_platform:
-            print(f"  ✓ Spawn point validated: on '{spawn_platform['name']}'")
+            logger.info(f"  ✓ Spawn point validated: on '{spawn_platform['name']}'")
             return analysis_data
 
         # Spawn point is NOT on a platform - need to fix it!
-        print(f"  ⚠️  WARNING: Spawn point ({spawn_x}, {spawn_y}) is NOT on any platform!")
+        logger.warning(f"  ⚠️  WARNING: Spawn point ({spawn_x}, {spawn_y}) is NOT on any platform!")
 
         # Find the largest, most stable platform (prefer higher platforms for better visibility)
-        # Sort by: 1) Y position (higher on screen first = lower Y values), 2) Width (larger first)
-        sorted_platforms = sorted(
+        # Rank by: 1) Y position (higher on screen first = lower Y values), 2) Width (larger first)
+        # Only the best one is needed, so a single min() pass instead of sorting the list
+        best_platform = min(
             platforms,
             key=lambda p: (p['y'], -p['width'])  # Lower Y first (higher on screen), then larger width
         )
 
-        best_platform = sorted_platforms[0]
-
         # Place spawn point in the center-left of the best platform, above the surface
         new_spawn_x = best_platform['x'] + best_platform['width'] // 3
         new_spawn_y = best_platform['y'] - 60  # 60px above platform top
 
-        print(f"  ✓ Corrected spawn point: ({spawn_x}, {spawn_y}) → ({new_spawn_x}, {new_spawn_y})")
-        print(f"    Now on platform: '{best_platform['name']}'")
+        logger.info(f"  ✓ Corrected spawn point: ({spawn_x}, {spawn_y}) → ({new_spawn_x}, {new_spawn_y})")
+        logger.info(f"    Now on platform: '{best_platform['name']}'")
 
         analysis_data['spawn']['x'] = new_spawn_x
         analysis_data['spawn']['y'] = new_spawn_y
@@ -949,7 +1464,7 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
     def process_character_sprite(
         self,
         sprite_path: Path,
-        num_frames: int = 8,
+        num_frames: Optional[int] = None,
         frame_width: Optional[int] = None,
         frame_height: Optional[int] = None
     ) -> tuple[Path, Dict[str, Any]]:
@@ -958,71 +1473,94 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
 
         Args:
             sprite_path: Path to sprite sheet image
-            num_frames: Number of animation frames
+            num_frames: Expected number of animation frames, only checked against the count
+                        Claude Vision detects (the detected count is always used)
             frame_width: Width of each frame (auto-detected if None)
             frame_height: Height of each frame (auto-detected if None)
 
         Returns:
             Tuple of (processed_sprite_path, sprite_config)
         """
-        print(f"\n🎨 Processing character sprite {sprite_path.name}...")
+        logger.info(f"\n🎨 Processing character sprite {sprite_path.name}...")
+
+        # Same sprite bytes -> reuse the processed sheet and skip layout analysis, background
+        # removal and extraction entirely. The frame count is always the detected one, so the
+        # num_frames hint is not part of the key.
+        with open(sprite_path, 'rb') as f:
+            sprite_hash = hashlib.file_digest(f, 'sha256').hexdigest()[:16]
+        cache_key = sprite_hash
+        cached_sheet_path = self._sprite_cache_dir / f"{cache_key}.png"
+        cached_config_path = self._sprite_cache_dir / f"{cache_key}.json"
+        processed_path = self.assets_dir / f"rearranged_{sprite_path.name}"
+        if cached_config_path.exists() and cached_sheet_path.exists():
+            shutil.copyfile(cached_sheet_path, processed_path)
+            sprite_config = {"sprite_path": str(processed_path), **orjson.loads(cached_config_path.read_bytes())}
+            logger.info(f"  ✓ Processed sprite cache hit ({cache_key}): "
+                        f"{sprite_config['num_frames']} frames at "
+                        f"{sprite_config['frame_width']}x{sprite_config['frame_height']}px")
+            return processed_path, sprite_config
 
         # NEW FLOW: Clean FIRST, then extract based on actual content edges
 
         # STEP 1: Analyze sprite sheet layout
-        import sys
-        print(f"  📊 Analyzing sprite sheet layout...")
-        sys.stdout.flush()
-        layout_info = self.sprite_analyzer.analyze_sprite_sheet_layout(sprite_path)
+        from PIL import Image
+        # The layout depends only on the sprite bytes, so it is cached separately from the
+        # processed sheet and survives a different requested frame count
+        layout_cache_path = self._sprite_cache_dir / f"{sprite_hash}_layout.json"
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            layout_future = None
+            if layout_cache_path.exists():
+                logger.info(f"  📊 Sprite sheet layout cache hit ({sprite_hash})")
+                layout_info = orjson.loads(layout_cache_path.read_bytes())
+            else:
+                # Background removal below does not need the layout, so the Vision call runs
+                # on the worker thread while this one does the CPU work
+                logger.info(f"  📊 Analyzing sprite sheet layout...")
+                layout_future = executor.submit(self.sprite_analyzer.analyze_sprite_sheet_layout, sprite_path)
+
+            # STEP 2: Remove background from ORIGINAL sprite sheet FIRST
+            logger.info(f"  🧹 Removing background from original sprite sheet...")
+            import numpy as np
+            original_img = Image.open(sprite_path)
+            original_img.load()  # Decode up front, not lazily inside the background-removal loop
+            if original_img.mode != 'RGBA':
+                original_img = original_img.convert('RGBA')
+
+            # One RGBA array through removal and cropping; back to PIL once at the end
+            sprite_data = self.bg_remover.remove_background_array(
+                np.array(original_img),
+                background_color=(255, 255, 255),  # White background
+                tolerance=40
+            )
 
-        print(f"  Layout: {layout_info['layout_type']} ({layout_info['rows']}×{layout_info['columns']})")
-        print(f"  Total frames: {layout_info['total_frames']}")
-        sys.stdout.flush()
+            # Auto-crop to remove excess transparent space
+            cleaned_img = Image.fromarray(self.bg_remover.auto_crop_array(sprite_data, padding=5), 'RGBA')
+            logger.info(f"  ✓ Background removed and cropped: {cleaned_img.size[0]}x{cleaned_img.size[1]}px")
 
-        # ALWAYS use the detected frame count from Claude Vision
-        detected_frames = layout_info['total_frames']
-        if detected_frames != num_frames:
-            print(f"\n⚠️  FRAME COUNT MISMATCH ⚠️")
-            print(f"  Requested: {num_frames}, Detected: {detected_frames}")
-            num_frames = detected_frames  # Override!
-            print(f"  Using detected count: {num_frames}\n")
-            sys.stdout.flush()
-        else:
-            print(f"  ✓ Frame counts match: {num_frames}")
-            sys.stdout.flush()
-
-        # STEP 2: Remove background from ORIGINAL sprite sheet FIRST
-        print(f"  🧹 Removing background from original sprite sheet...")
-        sys.stdout.flush()
-        original_img = Image.open(sprite_path)
-        if original_img.mode != 'RGBA':
-            original_img = original_img.convert('RGBA')
-
-        cleaned_img = self.bg_remover.remove_background(
-            original_img,
-            background_color=(255, 255, 255),  # White background
-            tolerance=40
-        )
+            if layout_future is not None:
+                layout_info = layout_future.result()
+                atomic_write_bytes(layout_cache_path, orjson.dumps(layout_info))
 
-        # Auto-crop to remove excess transparent space
-        cleaned_img = self.bg_remover.auto_crop(cleaned_img, padding=5)
-        print(f"  ✓ Background removed and cropped: {cleaned_img.size[0]}x{cleaned_img.size[1]}px")
-        sys.stdout.flush()
+        logger.info(f"  Layout: {layout_info['layout_type']} ({layout_info['rows']}×{layout_info['columns']})")
+        logger.info(f"  Total frames: {layout_info['total_frames']}")
 
-        # Save the cleaned sprite sheet temporarily
-        cleaned_sprite_path = self.output_dir / "assets" / f"cleaned_{sprite_path.name}"
-        cleaned_sprite_path.parent.mkdir(parents=True, exist_ok=True)
-        cleaned_img.save(cleaned_sprite_path)
+        # ALWAYS use the detected frame count from Claude Vision; a requested count is only
+        # compared against it for the log
+        detected_frames = layout_info['total_frames']
+        if num_frames is not None and detected_frames != num_frames:
+            logger.warning(f"\n⚠️  FRAME COUNT MISMATCH ⚠️")
+            logger.info(f"  Requested: {num_frames}, Detected: {detected_frames}")
+            logger.info(f"  Using detected count: {detected_frames}\n")
+        num_frames = detected_frames
 
         # STEP 3: NOW do smart extraction on the CLEANED image
         # This ensures frame boundaries are based on actual content edges, not pre-removal pixels
-        print(f"  ✂️  Extracting frames using content-edge detection on cleaned image...")
-        sys.stdout.flush()
-        temp_sprite_path = self.output_dir / "assets" / f"rearranged_{sprite_path.name}"
-        temp_sprite_path.parent.mkdir(parents=True, exist_ok=True)
+        logger.info(f"  ✂️  Extracting frames using content-edge detection on cleaned image...")
+        temp_sprite_path = processed_path
 
+        # Hand over the cleaned image in memory - only the final strip is written as PNG
         sprite_path, rearranged_info = self.sprite_analyzer.rearrange_to_horizontal(
-            cleaned_sprite_path,  # Use cleaned image!
+            cleaned_img,  # Use cleaned image!
             temp_sprite_path,
             layout_info=layout_info
         )
@@ -1032,26 +1570,23 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
         frame_width = rearranged_info['frame_width']
         frame_height = rearranged_info['frame_height']
 
-        print(f"  ✓ Extracted {num_frames} frames at {frame_width}x{frame_height}px each")
-        sys.stdout.flush()
+        logger.info(f"  ✓ Extracted {num_frames} frames at {frame_width}x{frame_height}px each")
 
         # STEP 4: Load the final processed sprite sheet
-        processed_img = Image.open(sprite_path)
-        cropped_width, cropped_height = processed_img.size
-        print(f"  ✓ Final sprite sheet: {cropped_width}x{cropped_height}px")
+        with Image.open(sprite_path) as processed_img:  # Header only - no pixel decode
+            cropped_width, cropped_height = processed_img.size
+        logger.info(f"  ✓ Final sprite sheet: {cropped_width}x{cropped_height}px")
 
-        print(f"  ✓ Frame size: {frame_width}x{frame_height}px")
-        print(f"  ✓ Number of frames: {num_frames}")
-        print(f"  ✓ Expected sprite sheet width: {frame_width * num_frames}px (actual: {cropped_width}px)")
+        logger.info(f"  ✓ Frame size: {frame_width}x{frame_height}px")
+        logger.info(f"  ✓ Number of frames: {num_frames}")
+        logger.info(f"  ✓ Expected sprite sheet width: {frame_width * num_frames}px (actual: {cropped_width}px)")
 
         # The sprite_path is already the final processed horizontal strip from smart extraction
         # Just rename it for clarity
         processed_path = sprite_path
-        print(f"  ✓ Final sprite sheet saved: {processed_path.name}")
+        logger.info(f"  ✓ Final sprite sheet saved: {processed_path.name}")
 
-        print(f"\n📦 Creating sprite_config with num_frames={num_frames}")
-        import sys
-        sys.stdout.flush()
+        logger.info(f"\n📦 Creating sprite_config with num_frames={num_frames}")
 
         sprite_config = {
             "sprite_path": str(processed_path),
@@ -1060,16 +1595,52 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
             "num_frames": num_frames
         }
 
-        print(f"  sprite_config created: frame_width={frame_width}, frame_height={frame_height}, num_frames={num_frames}")
-        sys.stdout.flush()
+        logger.info(f"  sprite_config created: frame_width={frame_width}, frame_height={frame_height}, num_frames={num_frames}")
+
+        # Store sheet first, sidecar last (via temp files) so a hit always has both halves
+        atomic_write_bytes(cached_sheet_path, processed_path.read_bytes())
+        atomic_write_bytes(cached_config_path, orjson.dumps({
+            "frame_width": frame_width,
+            "frame_height": frame_height,
+            "num_frames": num_frames
+        }))
 
         return processed_path, sprite_config
 
+    def _process_sprite_and_platforms(
+        self,
+        char_path: Path,
+        bg_path: Path,
+        num_frames: Optional[int] = None
+    ) -> tuple[Path, Dict[str, Any], Dict[str, Any]]:
+        """
+        Run character sprite processing and platform analysis side by side
+
+        The two only share their input paths, and both spend most of their time outside
+        the GIL (PIL work / Claude API round-trips), so the sprite pipeline overlaps the
+        platform-detection latency. Progress output from the two may interleave.
+
+        Args:
+            char_path: Path to character sprite sheet
+            bg_path: Path to background image
+            num_frames: Expected frame count hint (see process_character_sprite)
+
+        Returns:
+            Tuple of (processed_sprite_path, sprite_config, platform_analysis)
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            sprite_future = executor.submit(self.process_character_sprite, char_path, num_frames=num_frames)
+            platform_future = executor.submit(self.analyze_walkable_platforms, bg_path)
+            processed_sprite_path, sprite_config = sprite_future.result()
+            platform_analysis = platform_future.result()
+
+        return processed_sprite_path, sprite_config, platform_analysis
+
     def generate_game(
         self,
         character_sprite: str,
         background_image: str,
-        num_frames: int = 8,
+        num_frames: Optional[int] = None,
         game_name: str = "PlatformerGame",
         player_config: Optional[Dict[str, Any]] = None
     ) -> Path:
@@ -1079,16 +1650,16 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
         Args:
             character_sprite: Path to character sprite sheet
             background_image: Path to background image
-            num_frames: Number of animation frames in sprite sheet
+            num_frames: Expected frame count hint (the detected count is used)
             game_name: Name for the generated game
             player_config: Optional player physics configuration
 
         Returns:
             Path to generated game.html
         """
-        print("=" * 70)
-        print(f"🎮 Generating {game_name}")
-        print("=" * 70)
+        logger.info("=" * 70)
+        logger.info(f"🎮 Generating {game_name}")
+        logger.info("=" * 70)
 
         # Convert to Path objects
         char_path = Path(character_sprite)
@@ -1100,14 +1671,13 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
         if not bg_path.exists():
             raise FileNotFoundError(f"Background image not found: {bg_path}")
 
-        # Process assets
-        processed_sprite_path, sprite_config = self.process_character_sprite(
+        # Process assets (sprite cleanup and platform analysis run concurrently)
+        processed_sprite_path, sprite_config, platform_analysis = self._process_sprite_and_platforms(
             char_path,
-            num_frames=num_frames
+            bg_path,
+            num_frames
         )
 
-        platform_analysis = self.analyze_walkable_platforms(bg_path)
-
         # Set up default player configuration
         if player_config is None:
             player_config = {
@@ -1146,55 +1716,49 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
             "analysis": platform_analysis
         }
 
-        # Save configuration
-        print(f"\n💾 Saving game configuration...")
+        # Save configuration, export game and create run script. The three writes are
+        # independent, so they overlap. export_game also byte-copies the background
+        # (dimensions already come from platform_analysis) and sprite into assets/.
+        logger.info(f"\n💾 Saving game configuration and generating game files...")
         config_path = self.output_dir / "scene_config.json"
-        self.scene_gen.save_scene_config(scene_config, config_path)
-        print(f"  ✓ Config saved to {config_path}")
-
-        # Copy background to output directory
-        print(f"\n📦 Copying background...")
-        assets_dir = self.output_dir / "assets"
-        assets_dir.mkdir(exist_ok=True)
-
-        bg_dest = assets_dir / bg_path.name
-        Image.open(bg_path).save(bg_dest)
-        print(f"  ✓ Background: {bg_dest.name}")
-        print(f"  ✓ Character sprite already processed and saved")
-
-        # Export game
-        print(f"\n🔨 Generating game files...")
         game_path = self.output_dir / "game.html"
-        self.web_exporter.export_game(scene_config, game_path, embed_assets=False)
-        print(f"  ✓ Game HTML: {game_path}")
-
-        # Create run script
         run_script = self.output_dir / "run_game.py"
-        self._create_run_script(run_script)
-        print(f"  ✓ Run script: {run_script}")
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(self.scene_gen.save_scene_config, scene_config, config_path),
+                executor.submit(self.web_exporter.export_game, scene_config, game_path, embed_assets=False),
+                executor.submit(self._create_run_script, run_script)
+            ]
+            for future in futures:
+                future.result()  # Re-raise any write failure here
+        logger.info(f"  ✓ Config saved to {config_path}")
+        logger.info(f"  ✓ Background: assets/{bg_path.name}")
+        logger.info(f"  ✓ Character sprite already processed and saved")
+        logger.info(f"  ✓ Game HTML: {game_path}")
+        logger.info(f"  ✓ Run script: {run_script}")
 
         # Summary
-        print("\n" + "=" * 70)
-        print(f"✅ {game_name} Generated Successfully!")
-        print("=" * 70)
+        logger.info("\n" + "=" * 70)
+        logger.info(f"✅ {game_name} Generated Successfully!")
+        logger.info("=" * 70)
 
-        print(f"\n🎯 Game Features:")
-        print(f"  ✓ {len(platform_analysis['platforms'])} walkable platforms")
-        print(f"  ✓ {len(platform_analysis['gaps'])} gaps requiring jumps")
-        print(f"  ✓ Double jump mechanics")
-        print(f"  ✓ Responsive canvas sizing")
-        print(f"  ✓ {num_frames}-frame character animation")
+        logger.info(f"\n🎯 Game Features:")
+        logger.info(f"  ✓ {len(platform_analysis['platforms'])} walkable platforms")
+        logger.info(f"  ✓ {len(platform_analysis['gaps'])} gaps requiring jumps")
+        logger.info(f"  ✓ Double jump mechanics")
+        logger.info(f"  ✓ Responsive canvas sizing")
+        logger.info(f"  ✓ {sprite_config['num_frames']}-frame character animation")
 
-        print(f"\n🎮 To Play:")
-        print(f"    cd {self.output_dir} && python3 run_game.py")
-        print(f"    OR open http://localhost:8080/game.html")
+        logger.info(f"\n🎮 To Play:")
+        logger.info(f"    cd {self.output_dir} && python3 run_game.py")
+        logger.info(f"    OR open http://localhost:8080/game.html")
 
-        print("\n💡 Controls:")
-        print("  ← → : Move left/right")
-        print("  SPACE : Jump (double jump!)")
-        print("  R : Reset position")
+        logger.info("\n💡 Controls:")
+        logger.info("  ← → : Move left/right")
+        logger.info("  SPACE : Jump (double jump!)")
+        logger.info("  R : Reset position")
 
-        print("=" * 70)
+        logger.info("=" * 70)
 
         return game_path
 
@@ -1202,7 +1766,7 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
         self,
         character_sprite: str,
         background_image: str,
-        num_frames: int = 8,
+        num_frames: Optional[int] = None,
         game_name: str = "PlatformerGame",
         player_config: Optional[Dict[str, Any]] = None
     ) -> tuple[str, Dict[str, Any]]:
@@ -1212,16 +1776,16 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
         Args:
             character_sprite: Path to character sprite sheet
             background_image: Path to background image
-            num_frames: Number of animation frames
+            num_frames: Expected frame count hint (the detected count is used)
             game_name: Name for the generated game
             player_config: Optional player physics configuration
 
         Returns:
             Tuple of (game_html_string, scene_config_dict)
         """
-        print("=" * 70)
-        print(f"🎮 Generating {game_name} with embedded assets")
-        print("=" * 70)
+        logger.info("=" * 70)
+        logger.info(f"🎮 Generating {game_name} with embedded assets")
+        logger.info("=" * 70)
 
         # Convert to Path objects
         char_path = Path(character_sprite)
@@ -1233,14 +1797,13 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
         if not bg_path.exists():
             raise FileNotFoundError(f"Background image not found: {bg_path}")
 
-        # Process assets
-        processed_sprite_path, sprite_config = self.process_character_sprite(
+        # Process assets (sprite cleanup and platform analysis run concurrently)
+        processed_sprite_path, sprite_config, platform_analysis = self._process_sprite_and_platforms(
             char_path,
-            num_frames=num_frames
+            bg_path,
+            num_frames
         )
 
-        platform_analysis = self.analyze_walkable_platforms(bg_path)
-
         # Set up default player configuration
         if player_config is None:
             player_config = {
@@ -1250,18 +1813,12 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
             }
 
         # Convert images to base64
-        import base64
+        logger.info(f"\n📦 Encoding assets as base64...")
+        bg_data_url = _encode_file_to_data_url(bg_path)
+        logger.info(f"  ✓ Background encoded")
 
-        print(f"\n📦 Encoding assets as base64...")
-        with open(bg_path, 'rb') as f:
-            bg_base64 = base64.b64encode(f.read()).decode('utf-8')
-        bg_data_url = f"data:image/png;base64,{bg_base64}"
-        print(f"  ✓ Background encoded")
-
-        with open(processed_sprite_path, 'rb') as f:
-            sprite_base64 = base64.b64encode(f.read()).decode('utf-8')
-        sprite_data_url = f"data:image/png;base64,{sprite_base64}"
-        print(f"  ✓ Character sprite encoded")
+        sprite_data_url = _encode_file_to_data_url(processed_sprite_path)
+        logger.info(f"  ✓ Character sprite encoded")
 
         # Create scene configuration with data URLs
         scene_config = {
@@ -1294,15 +1851,15 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
         }
 
         # Generate HTML with embedded assets
-        print(f"\n🔨 Generating HTML with embedded assets...")
+        logger.info(f"\n🔨 Generating HTML with embedded assets...")
         game_html = self.web_exporter._generate_html(
             scene_config,
             bg_data_url,  # Pass data URL
             sprite_data_url  # Pass data URL
         )
 
-        print(f"  ✓ Game HTML generated: {len(game_html)} characters")
-        print("=" * 70)
+        logger.info(f"  ✓ Game HTML generated: {len(game_html)} characters")
+        logger.info("=" * 70)
 
         return game_html, scene_config
 
@@ -1312,7 +1869,7 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
         character_sprite_url: str,
         background_image_path: str,
         background_image_url: str,
-        num_frames: int = 8,
+        num_frames: Optional[int] = None,
         game_name: str = "PlatformerGame",
         player_config: Optional[Dict[str, Any]] = None,
         collectible_sprites: list = None,
@@ -1332,7 +1889,7 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
             character_sprite_url: Original URL to character sprite
             background_image_path: Local path to downloaded background
             background_image_url: Original URL to background
-            num_frames: Number of animation frames
+            num_frames: Expected frame count hint (the detected count is used)
             game_name: Name for the generated game
             player_config: Optional player physics configuration
             collectible_sprites: List of collectible sprite data URLs
@@ -1344,23 +1901,21 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
         Returns:
             Tuple of (game_html_string, scene_config_dict, debug_frames_base64_list)
         """
-        print("=" * 70)
-        print(f"🎮 Generating {game_name} with URL references")
-        print("=" * 70)
+        logger.info("=" * 70)
+        logger.info(f"🎮 Generating {game_name} with URL references")
+        logger.info("=" * 70)
 
         # Convert to Path objects
         char_path = Path(character_sprite_path)
         bg_path = Path(background_image_path)
 
-        # Process character sprite locally (remove background, get dimensions)
-        processed_sprite_path, sprite_config = self.process_character_sprite(
+        # Process character sprite and analyze background with Claude Vision concurrently
+        processed_sprite_path, sprite_config, platform_analysis = self._process_sprite_and_platforms(
             char_path,
-            num_frames=num_frames
+            bg_path,
+            num_frames
         )
 
-        # Analyze background locally with Claude Vision
-        platform_analysis = self.analyze_walkable_platforms(bg_path)
-
         # Set up default player configuration
         if player_config is None:
             player_config = {
@@ -1370,27 +1925,22 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
             }
 
         # Convert processed sprite to base64 for embedding
-        import base64
-        print(f"\n📦 Encoding processed sprite as base64...")
-        with open(processed_sprite_path, 'rb') as f:
-            sprite_base64 = base64.b64encode(f.read()).decode('utf-8')
-        processed_sprite_data_url = f"data:image/png;base64,{sprite_base64}"
-        print(f"  ✓ Processed sprite encoded ({len(sprite_base64)} bytes)")
+        logger.info(f"\n📦 Encoding processed sprite as base64...")
+        processed_sprite_data_url = _encode_file_to_data_url(processed_sprite_path)
+        logger.info(f"  ✓ Processed sprite encoded ({len(processed_sprite_data_url)} bytes)")
 
         # Process mob sprite if provided
         processed_mob_data_url = None
         mob_config = None
         if mob_sprite_path and mob_sprite_url:
-            print(f"\n👾 Processing mob sprite...")
+            logger.info(f"\n👾 Processing mob sprite...")
             mob_path = Path(mob_sprite_path)
             processed_mob_path, mob_config = self.process_character_sprite(
                 mob_path,
                 num_frames=num_frames
             )
-            with open(processed_mob_path, 'rb') as f:
-                mob_base64 = base64.b64encode(f.read()).decode('utf-8')
-            processed_mob_data_url = f"data:image/png;base64,{mob_base64}"
-            print(f"  ✓ Mob sprite processed ({len(mob_base64)} bytes)")
+            processed_mob_data_url = _encode_file_to_data_url(processed_mob_path)
+            logger.info(f"  ✓ Mob sprite processed ({len(processed_mob_data_url)} bytes)")
 
         # Create scene configuration
         scene_config = {
@@ -1433,7 +1983,7 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
             }
 
         # Generate HTML with URLs (background URL + sprite data URI + collectibles + mob)
-        print(f"\n🔨 Generating HTML with URL references...")
+        logger.info(f"\n🔨 Generating HTML with URL references...")
         game_html = self.web_exporter._generate_html(
             scene_config,
             background_image_url,  # Pass original URL for background
@@ -1445,15 +1995,15 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
             mob_config  # Pass mob sprite configuration
         )
 
-        print(f"  ✓ Game HTML generated: {len(game_html)} characters")
-        print(f"  ✓ Using original image URLs (Phaser compatible)")
+        logger.info(f"  ✓ Game HTML generated: {len(game_html)} characters")
+        logger.info(f"  ✓ Using original image URLs (Phaser compatible)")
 
         # Extract debug frames for visualization
-        print(f"\n🔍 Extracting debug frames for visualization...")
+        logger.info(f"\n🔍 Extracting debug frames for visualization...")
         debug_frames = self._extract_debug_frames(processed_sprite_path, sprite_config)
-        print(f"  ✓ Extracted {len(debug_frames)} debug frames")
+        logger.info(f"  ✓ Extracted {len(debug_frames)} debug frames")
 
-        print("=" * 70)
+        logger.info("=" * 70)
 
         return game_html, scene_config, debug_frames
 
@@ -1468,86 +2018,46 @@ Be critical and thorough. If detections aren't perfect, refine them!"""
         Returns:
             List of base64-encoded PNG frames as data URLs
         """
-        import base64
-        import io
+        from PIL import Image
 
         sprite_sheet = Image.open(sprite_sheet_path)
+        sprite_sheet.load()  # Decode once; every crop below is then a plain memory copy
         frame_width = sprite_config["frame_width"]
         frame_height = sprite_config["frame_height"]
         num_frames = sprite_config["num_frames"]
 
-        print(f"\n  🔍 Debug frame extraction:")
-        print(f"     Sprite sheet size: {sprite_sheet.size}")
-        print(f"     Frame dimensions: {frame_width}x{frame_height}px")
-        print(f"     Number of frames: {num_frames}")
-        print(f"     Extracting positions:")
+        logger.info(f"\n  🔍 Debug frame extraction:")
+        logger.info(f"     Sprite sheet size: {sprite_sheet.size}")
+        logger.info(f"     Frame dimensions: {frame_width}x{frame_height}px")
+        logger.info(f"     Number of frames: {num_frames}")
+        logger.info(f"     Extracting x=0 to {num_frames * frame_width} in {frame_width}px steps")
 
         debug_frames = []
+        buffer = io.BytesIO()  # Reused for every frame
 
         for i in range(num_frames):
             # Extract frame
             x = i * frame_width
-            x_end = x + frame_width
-            print(f"       Frame {i}: x={x} to {x_end} (width={frame_width})")
-            frame = sprite_sheet.crop((x, 0, x_end, frame_height))
+            frame = sprite_sheet.crop((x, 0, x + frame_width, frame_height))
 
-            # Convert to base64 data URL
-            buffer = io.BytesIO()
-            frame.save(buffer, format='PNG')
-            frame_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-            data_url = f"data:image/png;base64,{frame_base64}"
-
-            debug_frames.append(data_url)
+            # Convert to base64 data URL (fast deflate - these are small, transient debug tiles)
+            buffer.seek(0)
+            buffer.truncate()
+            frame.save(buffer, format='PNG', compress_level=1)
+            frame_base64 = pybase64.b64encode(buffer.getvalue()).decode('ascii')
+            debug_frames.append(f"data:image/png;base64,{frame_base64}")
 
         return debug_frames
 
     def _create_run_script(self, output_path: Path):
         """Create a simple HTTP server script to run the game"""
-        script_content = '''#!/usr/bin/env python3
-"""
-Simple HTTP server to run the game
-This avoids CORS issues when loading local files
-"""
-
-import http.server
-import socketserver
-import webbrowser
-import os
-from pathlib import Path
-
-PORT = 8080
-
-# Change to the directory containing this script
-os.chdir(Path(__file__).parent)
-
-Handler = http.server.SimpleHTTPRequestHandler
-
-print("=" * 70)
-print("🎮 Platformer Game")
-print("=" * 70)
-print(f"\\n🌐 Starting server at http://localhost:{PORT}")
-print(f"📁 Serving files from: {Path.cwd()}")
-print(f"\\n🎯 Opening game in your browser...")
-print(f"\\n⚠️  Press Ctrl+C to stop the server when you're done")
-print("=" * 70 + "\\n")
-
-# Open browser after a short delay
-import threading
-def open_browser():
-    import time
-    time.sleep(1)
-    webbrowser.open(f'http://localhost:{PORT}/game.html')
-
-threading.Thread(target=open_browser, daemon=True).start()
-
-# Start server
-with socketserver.TCPServer(("", PORT), Handler) as httpd:
-    try:
-        httpd.serve_forever()
-    except KeyboardInterrupt:
-        print("\\n\\n✅ Server stopped. Thanks for playing!")
-'''
-        output_path.write_text(script_content)
+        # Constant template: leave an identical, executable script (and its mtime) alone
+        if output_path.exists():
+            st = output_path.stat()
+            if (st.st_size == len(RUN_SCRIPT) and st.st_mode & 0o111
+                    and output_path.read_bytes() == RUN_SCRIPT):
+                return
+        output_path.write_bytes(RUN_SCRIPT)
         output_path.chmod(0o755)  # Make executable
 
 
@@ -1574,8 +2084,8 @@ def main():
         "--frames",
         "-f",
         type=int,
-        default=8,
-        help="Number of animation frames (default: 8)"
+        default=None,
+        help="Expected number of animation frames (default: use the detected count)"
     )
     parser.add_argument(
         "--output",
@@ -1601,7 +2111,7 @@ def main():
         game_name=args.name
     )
 
-    print(f"\n✨ Game ready at: {game_path}")
+    logger.info(f"\n✨ Game ready at: {game_path}")
 
 
 if __name__ == "__main__":
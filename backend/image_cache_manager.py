@@ -89,7 +89,7 @@ class ImageCache:
             
             # Write back to file
             with open(self.cache_file, 'w') as f:
-                json.dump(cache_data, f, indent=2)
+                json.dump(cache_data, f, separators=(',', ':'))
             
             logger.info(f"Image cached with key: {cache_key[:16]}... (URL: {image_url[:50]}...)")
         
@@ -13,7 +13,7 @@ import json
 import tempfile
 import httpx
 from pathlib import Path
-import base64
+import pybase64
 from cache_manager import cache
 from image_cache_manager import image_cache
 from game_cache_manager import game_cache
@@ -21,8 +21,8 @@ from component_cache_manager import component_cache
 
 from image_generation.generator import ImageGenerator
 from image_generation.config import ImageGenerationConfig
-from game_generator import GameGenerator
-from sprite_processing.sprite_sheet_analyzer import SpriteSheetAnalyzer
+from game_generator import GameGenerator, get_http_client
+from sprite_processing.sprite_sheet_analyzer import SpriteSheetAnalyzer, parse_json_reply
 
 # Load environment variables
 load_dotenv()
@@ -58,7 +58,8 @@ if not anthropic_api_key:
     logger.critical("ANTHROPIC_API_KEY not found in environment variables")
     raise ValueError("ANTHROPIC_API_KEY is required")
 
-client = Anthropic(api_key=anthropic_api_key)
+# Shares GameGenerator's HTTP/2 keep-alive pool, so prompt and vision calls reuse connections
+client = Anthropic(api_key=anthropic_api_key, http_client=get_http_client())
 
 # Request/Response Models
 class PromptRequest(BaseModel):
@@ -133,13 +134,11 @@ def analyze_collectible_metadata(collectible_path: Path, anthropic_client) -> Li
     Returns:
         List of dicts with 'name' and 'description' for each collectible (left to right order)
     """
-    import base64
-    
     logger.info(f"Analyzing collectible metadata with Claude Vision...")
     
     # Load and encode image
     with open(collectible_path, 'rb') as f:
-        image_data = base64.standard_b64encode(f.read()).decode('utf-8')
+        image_data = pybase64.standard_b64encode(f.read()).decode('utf-8')
     
     # Determine media type
     ext = collectible_path.suffix.lower()
@@ -268,17 +267,8 @@ IMPORTANT:
         response_text = message.content[0].text.strip()
         logger.info(f"Claude Vision response: {response_text[:200]}...")
         
-        # Strip markdown code blocks if present (```json ... ```)
-        if response_text.startswith("```"):
-            # Remove opening ```json or ```
-            response_text = response_text.split("\n", 1)[1] if "\n" in response_text else response_text[3:]
-            # Remove closing ```
-            if response_text.endswith("```"):
-                response_text = response_text.rsplit("```", 1)[0]
-            response_text = response_text.strip()
-        
-        # Parse JSON response
-        collectibles_data = json.loads(response_text)
+        # Parse JSON response (markdown code fences are stripped first)
+        collectibles_data = parse_json_reply(response_text)
         collectibles_list = collectibles_data.get("collectibles", [])
         
         logger.info(f"Identified {len(collectibles_list)} collectibles:")
@@ -315,7 +305,6 @@ def segment_collectible_sprites(collectible_path: Path, sprite_analyzer, expecte
         List of base64 data URLs for individual collectible sprites
     """
     from PIL import Image
-    import base64
     import io
     from sprite_processing.background_remover import BackgroundRemover
     
@@ -355,29 +344,21 @@ def segment_collectible_sprites(collectible_path: Path, sprite_analyzer, expecte
     # STEP 3: Extract frames using smart extraction (connected component analysis)
     logger.info("  Extracting individual collectible sprites...")
     
-    # Save cleaned image temporarily for extraction
-    temp_cleaned_path = collectible_path.parent / f"cleaned_{collectible_path.name}"
-    cleaned_img.save(temp_cleaned_path)
-    
-    # Use the same smart extraction method as character sprites
+    # Use the same smart extraction method as character sprites, on the in-memory cleaned image
     frames, frame_width, frame_height = sprite_analyzer.extract_frames_smart(
-        temp_cleaned_path,
+        cleaned_img,
         rows=layout_info['rows'],
         columns=layout_info['columns']
     )
     
     logger.info(f"  Extracted {len(frames)} collectible sprites at {frame_width}x{frame_height}px each")
     
-    # Clean up temp file
-    if temp_cleaned_path.exists():
-        temp_cleaned_path.unlink()
-    
     # STEP 4: Convert each frame to base64 data URL
     sprite_data_urls = []
     for i, frame in enumerate(frames):
         buffer = io.BytesIO()
-        frame.save(buffer, format='PNG')
-        sprite_data_url = f"data:image/png;base64,{base64.b64encode(buffer.getvalue()).decode()}"
+        frame.save(buffer, format='PNG', compress_level=1)  # Fast encode; the data URL is transient
+        sprite_data_url = f"data:image/png;base64,{pybase64.b64encode(buffer.getbuffer()).decode('ascii')}"
         sprite_data_urls.append(sprite_data_url)
         logger.info(f"    Collectible {i+1}/{len(frames)}: {frame.size[0]}x{frame.size[1]}px")
     
@@ -467,7 +448,6 @@ def generate_platform_debug(
         Base64 encoded PNG image
     """
     from PIL import Image, ImageDraw
-    import base64
     import io
 
     # Load background
@@ -535,9 +515,8 @@ def generate_platform_debug(
 
     # Convert to base64
     buffer = io.BytesIO()
-    result.save(buffer, format='PNG')
-    buffer.seek(0)
-    img_base64 = base64.b64encode(buffer.read()).decode('utf-8')
+    result.save(buffer, format='PNG', compress_level=1)
+    img_base64 = pybase64.b64encode(buffer.getbuffer()).decode('utf-8')
 
     return f"data:image/png;base64,{img_base64}"
 
@@ -620,21 +599,13 @@ async def generate_asset_prompts(request: PromptRequest):
 
         logger.success(f"[{request_id}] Successfully generated asset prompts ({len(response_text)} chars)")
 
-        # Auto-detect and remove markdown code fences if present
+        # Markdown code fences, if present, are removed by parse_json_reply
         if response_text.startswith("```"):
             logger.info(f"[{request_id}] Detected markdown code fences, removing...")
-            # Remove ```json or ``` at start and ``` at end
-            lines = response_text.split('\n')
-            if lines[0].startswith("```"):
-                lines = lines[1:]  # Remove first line with ```json
-            if lines and lines[-1].strip() == "```":
-                lines = lines[:-1]  # Remove last line with ```
-            response_text = '\n'.join(lines).strip()
-            logger.info(f"[{request_id}] Code fences removed")
 
         # Parse the Claude response
         try:
-            claude_data = json.loads(response_text)
+            claude_data = parse_json_reply(response_text)
         except json.JSONDecodeError as e:
             logger.error(f"[{request_id}] Failed to parse Claude JSON response: {str(e)}")
             logger.error(f"[{request_id}] Response text: {response_text}")
@@ -1020,19 +991,31 @@ async def generate_game(request: GenerateGameRequest):
             output_dir = temp_path / "generated_game"
             game_gen = GameGenerator(output_dir=str(output_dir))
 
+            # Look up all cached components at once; the reads overlap in worker threads
+            cached_components = await component_cache.get_components(
+                request.background_url,
+                request.character_url,
+                request.num_frames,
+                mob_url=request.mob_url,
+                collectible_url=request.collectible_url
+            )
+
+            # The four components are independent, so cache misses are processed concurrently
+            # (Claude Vision calls and PIL work run in worker threads) instead of one after another
+
             # ========== COMPONENT 1: BACKGROUND ==========
-            bg_cached = component_cache.get_background_component(request.background_url)
-            if bg_cached:
-                logger.info(f"[{request_id}] ✓ Background component CACHE HIT")
-                platform_analysis = bg_cached['platform_analysis']
-                cache_status['background'] = 'HIT'
-            else:
+            async def load_background():
+                bg_cached = cached_components['background']
+                if bg_cached:
+                    logger.info(f"[{request_id}] ✓ Background component CACHE HIT")
+                    cache_status['background'] = 'HIT'
+                    return bg_cached['platform_analysis']
+
                 logger.info(f"[{request_id}] ✗ Background component CACHE MISS - processing...")
                 # Download background
                 async with httpx.AsyncClient(timeout=30.0) as http_client:
                     bg_response = await http_client.get(request.background_url)
                     bg_response.raise_for_status()
-                    bg_path = temp_path / "background.png"
                     bg_path.write_bytes(bg_response.content)
                 # Analyze with Claude Vision
                 platform_analysis = await asyncio.to_thread(
@@ -1042,22 +1025,25 @@ async def generate_game(request: GenerateGameRequest):
                 # Cache the result
                 component_cache.save_background_component(request.background_url, platform_analysis)
                 cache_status['background'] = 'MISS'
-            
+                return platform_analysis
+
             # ========== COMPONENT 2: CHARACTER ==========
-            char_cached = component_cache.get_character_component(request.character_url, request.num_frames)
-            if char_cached:
-                logger.info(f"[{request_id}] ✓ Character component CACHE HIT")
-                sprite_config = char_cached['sprite_config']
-                processed_sprite_data_url = char_cached['processed_sprite_data_url']
-                debug_frames = char_cached['debug_frames']
-                cache_status['character'] = 'HIT'
-            else:
+            async def load_character():
+                char_cached = cached_components['character']
+                if char_cached:
+                    logger.info(f"[{request_id}] ✓ Character component CACHE HIT")
+                    cache_status['character'] = 'HIT'
+                    return (
+                        char_cached['sprite_config'],
+                        char_cached['processed_sprite_data_url'],
+                        char_cached['debug_frames']
+                    )
+
                 logger.info(f"[{request_id}] ✗ Character component CACHE MISS - processing...")
                 # Download character
                 async with httpx.AsyncClient(timeout=30.0) as http_client:
                     char_response = await http_client.get(request.character_url)
                     char_response.raise_for_status()
-                    char_path = temp_path / "character.png"
                     char_path.write_bytes(char_response.content)
                 # Process sprite
                 processed_sprite_path, sprite_config = await asyncio.to_thread(
@@ -1067,7 +1053,7 @@ async def generate_game(request: GenerateGameRequest):
                 )
                 # Convert to base64
                 with open(processed_sprite_path, 'rb') as f:
-                    sprite_base64 = base64.b64encode(f.read()).decode('utf-8')
+                    sprite_base64 = pybase64.b64encode(f.read()).decode('utf-8')
                 processed_sprite_data_url = f"data:image/png;base64,{sprite_base64}"
                 # Extract debug frames
                 debug_frames = await asyncio.to_thread(
@@ -1084,90 +1070,102 @@ async def generate_game(request: GenerateGameRequest):
                     debug_frames
                 )
                 cache_status['character'] = 'MISS'
-            
+                return sprite_config, processed_sprite_data_url, debug_frames
+
             # ========== COMPONENT 3: MOB (if provided) ==========
-            mob_config = None
-            processed_mob_data_url = None
-            if request.mob_url:
-                mob_cached = component_cache.get_mob_component(request.mob_url, request.num_frames)
+            async def load_mob():
+                if not request.mob_url:
+                    return None, None
+                mob_cached = cached_components['mob']
                 if mob_cached:
                     logger.info(f"[{request_id}] ✓ Mob component CACHE HIT")
-                    mob_config = mob_cached['sprite_config']
-                    processed_mob_data_url = mob_cached['processed_sprite_data_url']
                     cache_status['mob'] = 'HIT'
-                else:
-                    logger.info(f"[{request_id}] ✗ Mob component CACHE MISS - processing...")
-                    # Download mob
-                    async with httpx.AsyncClient(timeout=30.0) as http_client:
-                        mob_response = await http_client.get(request.mob_url)
-                        mob_response.raise_for_status()
-                        mob_path = temp_path / "mob.png"
-                        mob_path.write_bytes(mob_response.content)
-                    # Process mob sprite
-                    processed_mob_path, mob_config = await asyncio.to_thread(
-                        game_gen.process_character_sprite,
-                        mob_path,
-                        num_frames=request.num_frames
-                    )
-                    # Convert to base64
-                    with open(processed_mob_path, 'rb') as f:
-                        mob_base64 = base64.b64encode(f.read()).decode('utf-8')
-                    processed_mob_data_url = f"data:image/png;base64,{mob_base64}"
-                    # Cache the result
-                    component_cache.save_mob_component(
-                        request.mob_url,
-                        request.num_frames,
-                        mob_config,
-                        processed_mob_data_url
-                    )
-                    cache_status['mob'] = 'MISS'
-            
+                    return mob_cached['sprite_config'], mob_cached['processed_sprite_data_url']
+
+                logger.info(f"[{request_id}] ✗ Mob component CACHE MISS - processing...")
+                # Download mob
+                async with httpx.AsyncClient(timeout=30.0) as http_client:
+                    mob_response = await http_client.get(request.mob_url)
+                    mob_response.raise_for_status()
+                    mob_path.write_bytes(mob_response.content)
+                # Process mob sprite
+                processed_mob_path, mob_config = await asyncio.to_thread(
+                    game_gen.process_character_sprite,
+                    mob_path,
+                    num_frames=request.num_frames
+                )
+                # Convert to base64
+                with open(processed_mob_path, 'rb') as f:
+                    mob_base64 = pybase64.b64encode(f.read()).decode('utf-8')
+                processed_mob_data_url = f"data:image/png;base64,{mob_base64}"
+                # Cache the result
+                component_cache.save_mob_component(
+                    request.mob_url,
+                    request.num_frames,
+                    mob_config,
+                    processed_mob_data_url
+                )
+                cache_status['mob'] = 'MISS'
+                return mob_config, processed_mob_data_url
+
             # ========== COMPONENT 4: COLLECTIBLES (if provided) ==========
-            collectible_sprites = []
-            collectible_metadata = []
-            if request.collectible_url:
-                coll_cached = component_cache.get_collectible_component(request.collectible_url)
+            async def load_collectibles():
+                if not request.collectible_url:
+                    return [], []
+                coll_cached = cached_components['collectible']
                 if coll_cached:
                     logger.info(f"[{request_id}] ✓ Collectible component CACHE HIT")
-                    collectible_metadata = coll_cached['collectible_metadata']
-                    collectible_sprites = coll_cached['collectible_sprites']
                     cache_status['collectible'] = 'HIT'
-                else:
-                    logger.info(f"[{request_id}] ✗ Collectible component CACHE MISS - processing...")
-                    # Download collectibles
-                    async with httpx.AsyncClient(timeout=30.0) as http_client:
-                        coll_response = await http_client.get(request.collectible_url)
-                        coll_response.raise_for_status()
-                        coll_path = temp_path / "collectibles.png"
-                        coll_path.write_bytes(coll_response.content)
-                    # Analyze metadata with Claude Vision
-                    collectible_metadata = await asyncio.to_thread(
-                        analyze_collectible_metadata,
-                        coll_path,
-                        client
-                    )
-                    # Segment sprites
-                    collectible_sprites = await asyncio.to_thread(
-                        segment_collectible_sprites,
-                        coll_path,
-                        game_gen.sprite_analyzer,
-                        len(collectible_metadata)
-                    )
-                    # Pad metadata if needed
-                    while len(collectible_metadata) < len(collectible_sprites):
-                        idx = len(collectible_metadata)
-                        collectible_metadata.append({
-                            "name": f"Mystery Item {idx + 1}",
-                            "status_effect": "Unknown Effect",
-                            "description": "A mysterious collectible item with unknown powers!"
-                        })
-                    # Cache the result
-                    component_cache.save_collectible_component(
-                        request.collectible_url,
-                        collectible_metadata,
-                        collectible_sprites
-                    )
-                    cache_status['collectible'] = 'MISS'
+                    return coll_cached['collectible_metadata'], coll_cached['collectible_sprites']
+
+                logger.info(f"[{request_id}] ✗ Collectible component CACHE MISS - processing...")
+                # Download collectibles
+                async with httpx.AsyncClient(timeout=30.0) as http_client:
+                    coll_response = await http_client.get(request.collectible_url)
+                    coll_response.raise_for_status()
+                    coll_path = temp_path / "collectibles.png"
+                    coll_path.write_bytes(coll_response.content)
+                # Analyze metadata with Claude Vision
+                collectible_metadata = await asyncio.to_thread(
+                    analyze_collectible_metadata,
+                    coll_path,
+                    client
+                )
+                # Segment sprites
+                collectible_sprites = await asyncio.to_thread(
+                    segment_collectible_sprites,
+                    coll_path,
+                    game_gen.sprite_analyzer,
+                    len(collectible_metadata)
+                )
+                # Pad metadata if needed
+                while len(collectible_metadata) < len(collectible_sprites):
+                    idx = len(collectible_metadata)
+                    collectible_metadata.append({
+                        "name": f"Mystery Item {idx + 1}",
+                        "status_effect": "Unknown Effect",
+                        "description": "A mysterious collectible item with unknown powers!"
+                    })
+                # Cache the result
+                component_cache.save_collectible_component(
+                    request.collectible_url,
+                    collectible_metadata,
+                    collectible_sprites
+                )
+                cache_status['collectible'] = 'MISS'
+                return collectible_metadata, collectible_sprites
+
+            (
+                platform_analysis,
+                (sprite_config, processed_sprite_data_url, debug_frames),
+                (mob_config, processed_mob_data_url),
+                (collectible_metadata, collectible_sprites)
+            ) = await asyncio.gather(
+                load_background(),
+                load_character(),
+                load_mob(),
+                load_collectibles()
+            )
 
             # Generate game with URLs (runs in thread pool since it's blocking)
             logger.info(f"[{request_id}] Generating game with Claude Vision analysis...")
@@ -1310,7 +1308,9 @@ async def generate_game(request: GenerateGameRequest):
             # Save to cache for future requests
             logger.info(f"[{request_id}] Caching game for future requests...")
             try:
-                game_cache.save_game(
+                # Serializing and writing the archive is blocking work - keep it off the event loop
+                await asyncio.to_thread(
+                    game_cache.save_game,
                     background_url=request.background_url,
                     character_url=request.character_url,
                     mob_url=request.mob_url,
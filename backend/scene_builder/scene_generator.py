@@ -6,7 +6,7 @@ Combines background and character into a playable scene configuration
 from PIL import Image
 from typing import Dict, Union, Optional
 from pathlib import Path
-import json
+import orjson
 
 from .background_analyzer import BackgroundAnalyzer
 
@@ -112,11 +112,8 @@ class SceneGenerator:
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Convert paths to strings for JSON serialization
-        config_copy = scene_config.copy()
-
-        with open(output_path, 'w') as f:
-            json.dump(config_copy, f, indent=2)
+        # orjson serializes straight to bytes in C (no Python-side walk of the dict tree)
+        output_path.write_bytes(orjson.dumps(scene_config, option=orjson.OPT_INDENT_2))
 
         print(f"✓ Scene configuration saved to: {output_path}")
 
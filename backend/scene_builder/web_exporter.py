@@ -6,7 +6,7 @@ Exports scenes as playable HTML5 games with Phaser.js
 from typing import Dict, Union
 from pathlib import Path
 import base64
-import json
+import orjson
 import shutil
 
 
@@ -42,21 +42,21 @@ class WebGameExporter:
         bg_src = Path(scene_config['background']['path'])
         bg_dest = assets_dir / bg_src.name
         if bg_src.resolve() != bg_dest.resolve():
-            shutil.copy(bg_src, bg_dest)
+            shutil.copyfile(bg_src, bg_dest)  # Byte copy via sendfile, no decode/re-encode
         bg_path = f"assets/{bg_src.name}"
 
         # Copy character sprite
         sprite_src = Path(scene_config['character']['sprite_path'])
         sprite_dest = assets_dir / sprite_src.name
         if sprite_src.resolve() != sprite_dest.resolve():
-            shutil.copy(sprite_src, sprite_dest)
+            shutil.copyfile(sprite_src, sprite_dest)
         sprite_path = f"assets/{sprite_src.name}"
 
         # Generate HTML
         html = self._generate_html(scene_config, bg_path, sprite_path)
 
         # Write to file
-        with open(output_path, 'w') as f:
+        with open(output_path, 'w', encoding='utf-8') as f:
             f.write(html)
 
         print(f"✓ Playable game exported to: {output_path}")
@@ -76,10 +76,11 @@ class WebGameExporter:
     ) -> str:
         """Generate complete HTML5 game"""
 
-        platforms_json = json.dumps(config['physics']['platforms'])
-        collectible_sprites_json = json.dumps(collectible_sprites if collectible_sprites else [])
-        collectible_positions_json = json.dumps(collectible_positions if collectible_positions else [])
-        collectible_metadata_json = json.dumps(collectible_metadata if collectible_metadata else [])
+        # orjson: the collectible list holds whole data URLs, which json.dumps escapes char by char
+        platforms_json = orjson.dumps(config['physics']['platforms']).decode()
+        collectible_sprites_json = orjson.dumps(collectible_sprites if collectible_sprites else []).decode()
+        collectible_positions_json = orjson.dumps(collectible_positions if collectible_positions else []).decode()
+        collectible_metadata_json = orjson.dumps(collectible_metadata if collectible_metadata else []).decode()
         
         # Prepare mob data
         has_mob = mob_sprite_path is not None and mob_data is not None
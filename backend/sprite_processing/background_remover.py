@@ -43,38 +43,59 @@ class BackgroundRemover:
         if isinstance(image, (str, Path)):
             img = Image.open(image)
         else:
-            img = image.copy()
+            img = image
 
         # Convert to RGBA if needed
         if img.mode != 'RGBA':
             img = img.convert('RGBA')
 
-        # Convert to numpy array
+        # Convert to numpy array (np.array copies, so the input image is left untouched)
         data = np.array(img)
+        self.remove_background_array(data, background_color, tolerance)
 
-        # Get RGB channels
-        r, g, b, a = data[:, :, 0], data[:, :, 1], data[:, :, 2], data[:, :, 3]
+        # Convert back to PIL Image
+        result = Image.fromarray(data, 'RGBA')
+
+        return result
+
+    def remove_background_array(
+        self,
+        data: np.ndarray,
+        background_color: Optional[Tuple[int, int, int]] = None,
+        tolerance: int = 30
+    ) -> np.ndarray:
+        """
+        Remove background in place from an RGBA array (H x W x 4, uint8)
+
+        Lets callers keep one array through removal and cropping instead of
+        round-tripping through PIL between steps.
+
+        Args:
+            data: Writable RGBA pixel array; background pixels get alpha 0
+            background_color: Specific RGB color to remove. If None, auto-detects white/light backgrounds
+            tolerance: Color tolerance for background removal (0-255)
+
+        Returns:
+            The same array, for chaining
+        """
+        rgb = data[..., :3]
 
         if background_color is None:
             # Auto-detect white/light backgrounds
             # Pixels where all RGB values are >= threshold
-            mask = (r >= self.threshold) & (g >= self.threshold) & (b >= self.threshold)
+            mask = (rgb >= self.threshold).all(axis=-1)
         else:
-            # Remove specific color with tolerance
-            bg_r, bg_g, bg_b = background_color
-            mask = (
-                (np.abs(r.astype(int) - bg_r) <= tolerance) &
-                (np.abs(g.astype(int) - bg_g) <= tolerance) &
-                (np.abs(b.astype(int) - bg_b) <= tolerance)
-            )
+            # Remove specific color with tolerance: |c - bg| <= tol is lo <= c <= hi with the
+            # bounds clamped to 0..255, so the compares stay on uint8 without a widened copy
+            bg = np.array(background_color, dtype=np.int16)
+            lo = np.clip(bg - tolerance, 0, 255).astype(np.uint8)
+            hi = np.clip(bg + tolerance, 0, 255).astype(np.uint8)
+            mask = ((rgb >= lo) & (rgb <= hi)).all(axis=-1)
 
         # Set alpha to 0 for background pixels
         data[mask, 3] = 0
 
-        # Convert back to PIL Image
-        result = Image.fromarray(data, 'RGBA')
-
-        return result
+        return data
 
     def auto_crop(self, image: Image.Image, padding: int = 0) -> Image.Image:
         """
@@ -106,6 +127,30 @@ class BackgroundRemover:
 
         return image.crop(bbox)
 
+    @staticmethod
+    def auto_crop_array(data: np.ndarray, padding: int = 0) -> np.ndarray:
+        """
+        Crop an RGBA array to its non-transparent content (array counterpart of auto_crop)
+
+        Args:
+            data: RGBA pixel array
+            padding: Additional padding around cropped content
+
+        Returns:
+            View of the cropped region (the whole array if it is fully transparent)
+        """
+        opaque = data[..., 3] > 0
+        rows = np.flatnonzero(opaque.any(axis=1))
+        if rows.size == 0:
+            # Image is completely transparent
+            return data
+        cols = np.flatnonzero(opaque.any(axis=0))
+
+        height, width = opaque.shape
+        top, bottom = max(0, rows[0] - padding), min(height, rows[-1] + 1 + padding)
+        left, right = max(0, cols[0] - padding), min(width, cols[-1] + 1 + padding)
+        return data[top:bottom, left:right]
+
     def process_sprite(
         self,
         image: Union[str, Path, Image.Image],
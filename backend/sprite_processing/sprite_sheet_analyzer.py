@@ -10,60 +10,38 @@ import anthropic
 import os
 import base64
 import io
+import re
 import numpy as np
+import orjson
 
 
-class SpriteSheetAnalyzer:
-    """Analyzes sprite sheet layouts using Claude Vision API"""
+# Leading ```json / ``` line and trailing ``` of a fenced Claude reply
+FENCE_RE = re.compile(r"\A```[\w-]*[ \t]*\n?|\n?```\Z")
 
-    def __init__(self, api_key: Optional[str] = None):
-        """Initialize analyzer with Anthropic API key"""
-        self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
-        if not self.api_key:
-            raise ValueError("ANTHROPIC_API_KEY not found in environment or passed as argument")
-        self.client = anthropic.Anthropic(api_key=self.api_key)
 
-    def analyze_sprite_sheet_layout(
-        self,
-        image_path: Union[str, Path]
-    ) -> Dict[str, Any]:
-        """
-        Analyze sprite sheet layout using Claude Vision API
-
-        Args:
-            image_path: Path to sprite sheet image
-
-        Returns:
-            Dict with layout information:
-            {
-                'layout_type': 'horizontal' | 'grid',
-                'rows': int,
-                'columns': int,
-                'total_frames': int,
-                'frame_width': int,
-                'frame_height': int,
-                'explanation': str
-            }
-        """
-        image_path = Path(image_path)
+def parse_json_reply(text: str):
+    """Parse a Claude JSON reply: strip a surrounding ``` fence, then fall back to its outermost {...} span"""
+    text = FENCE_RE.sub("", text.strip()).strip()
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end < start:
+            raise
+        return orjson.loads(text[start:end + 1])
 
-        # Load and encode image
-        with open(image_path, 'rb') as f:
-            image_data = base64.standard_b64encode(f.read()).decode('utf-8')
 
-        # Determine media type
-        ext = image_path.suffix.lower()
-        media_type_map = {
-            '.png': 'image/png',
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.webp': 'image/webp',
-            '.gif': 'image/gif'
-        }
-        media_type = media_type_map.get(ext, 'image/png')
+# Upload media type by file extension (anything else is sent as PNG)
+MEDIA_TYPES = {
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.webp': 'image/webp',
+    '.gif': 'image/gif'
+}
 
-        # Create vision prompt
-        prompt = """Analyze this sprite sheet image for a 2D game character animation.
+# Static layout-analysis instructions, built once at import rather than per call
+LAYOUT_PROMPT = """Analyze this sprite sheet image for a 2D game character animation.
 
 I need you to determine:
 1. **Layout type**: Is it arranged as:
@@ -96,6 +74,54 @@ Please respond in this EXACT JSON format (no markdown, just JSON):
     "explanation": "Brief description of what you see"
 }"""
 
+
+class SpriteSheetAnalyzer:
+    """Analyzes sprite sheet layouts using Claude Vision API"""
+
+    def __init__(self, api_key: Optional[str] = None, http_client=None):
+        """
+        Initialize analyzer with Anthropic API key
+
+        Args:
+            api_key: Anthropic API key (defaults to ANTHROPIC_API_KEY)
+            http_client: Optional shared anthropic.DefaultHttpxClient so connections are reused across analyzers
+        """
+        self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
+        if not self.api_key:
+            raise ValueError("ANTHROPIC_API_KEY not found in environment or passed as argument")
+        self.client = anthropic.Anthropic(api_key=self.api_key, http_client=http_client)
+
+    def analyze_sprite_sheet_layout(
+        self,
+        image_path: Union[str, Path]
+    ) -> Dict[str, Any]:
+        """
+        Analyze sprite sheet layout using Claude Vision API
+
+        Args:
+            image_path: Path to sprite sheet image
+
+        Returns:
+            Dict with layout information:
+            {
+                'layout_type': 'horizontal' | 'grid',
+                'rows': int,
+                'columns': int,
+                'total_frames': int,
+                'frame_width': int,
+                'frame_height': int,
+                'explanation': str
+            }
+        """
+        image_path = Path(image_path)
+
+        # Load and encode image
+        with open(image_path, 'rb') as f:
+            image_data = base64.standard_b64encode(f.read()).decode('utf-8')
+
+        # Determine media type
+        media_type = MEDIA_TYPES.get(image_path.suffix.lower(), 'image/png')
+
         # Call Claude Vision API
         message = self.client.messages.create(
             model="claude-sonnet-4-5-20250929",
@@ -114,7 +140,7 @@ Please respond in this EXACT JSON format (no markdown, just JSON):
                         },
                         {
                             "type": "text",
-                            "text": prompt
+                            "text": LAYOUT_PROMPT
                         }
                     ],
                 }
@@ -124,16 +150,8 @@ Please respond in this EXACT JSON format (no markdown, just JSON):
         # Parse response
         response_text = message.content[0].text.strip()
 
-        # Try to extract JSON from response
-        import json
         try:
-            # Remove markdown code blocks if present
-            if '```json' in response_text:
-                response_text = response_text.split('```json')[1].split('```')[0].strip()
-            elif '```' in response_text:
-                response_text = response_text.split('```')[1].split('```')[0].strip()
-
-            layout_info = json.loads(response_text)
+            layout_info = parse_json_reply(response_text)
 
             # Validate required fields
             required_fields = ['layout_type', 'rows', 'columns', 'total_frames', 'frame_width', 'frame_height']
@@ -143,12 +161,13 @@ Please respond in this EXACT JSON format (no markdown, just JSON):
 
             return layout_info
 
-        except (json.JSONDecodeError, ValueError) as e:
+        except ValueError as e:
+            # orjson.JSONDecodeError is a ValueError too
             raise ValueError(f"Failed to parse Claude Vision response: {e}\nResponse: {response_text}")
 
     def detect_frame_spacing(
         self,
-        image_path: Union[str, Path],
+        image_path: Union[str, Path, Image.Image],
         rows: int,
         columns: int,
         frame_width: int,
@@ -158,7 +177,7 @@ Please respond in this EXACT JSON format (no markdown, just JSON):
         Detect horizontal and vertical spacing between frames
 
         Args:
-            image_path: Path to sprite sheet
+            image_path: Path to sprite sheet, or an already-opened PIL Image
             rows: Number of rows
             columns: Number of columns
             frame_width: Expected frame width
@@ -167,15 +186,19 @@ Please respond in this EXACT JSON format (no markdown, just JSON):
         Returns:
             Tuple of (horizontal_spacing, vertical_spacing) in pixels
         """
-        sprite_sheet = Image.open(image_path)
+        if isinstance(image_path, Image.Image):
+            sheet_width, sheet_height = image_path.size
+        else:
+            with Image.open(image_path) as sprite_sheet:  # Only the header is read
+                sheet_width, sheet_height = sprite_sheet.size
 
         # Calculate what the total size should be without spacing
         expected_width_no_spacing = frame_width * columns
         expected_height_no_spacing = frame_height * rows
 
         # Calculate spacing based on actual vs expected dimensions
-        extra_width = sprite_sheet.width - expected_width_no_spacing
-        extra_height = sprite_sheet.height - expected_height_no_spacing
+        extra_width = sheet_width - expected_width_no_spacing
+        extra_height = sheet_height - expected_height_no_spacing
 
         # Distribute extra space evenly between frames
         h_spacing = extra_width // max(columns - 1, 1) if columns > 1 else 0
@@ -214,8 +237,9 @@ Please respond in this EXACT JSON format (no markdown, just JSON):
         # Detect spacing if enabled
         h_spacing, v_spacing = 0, 0
         if auto_detect_spacing:
+            # Reuse the open sheet instead of opening the file a second time
             h_spacing, v_spacing = self.detect_frame_spacing(
-                image_path, rows, columns, frame_width, frame_height
+                sprite_sheet, rows, columns, frame_width, frame_height
             )
             if h_spacing > 0 or v_spacing > 0:
                 print(f"  Detected spacing: {h_spacing}px horizontal, {v_spacing}px vertical")
@@ -243,7 +267,7 @@ Please respond in this EXACT JSON format (no markdown, just JSON):
 
     def extract_frames_smart(
         self,
-        image_path: Union[str, Path],
+        image_path: Union[str, Path, Image.Image],
         rows: int,
         columns: int
     ) -> Tuple[list[Image.Image], int, int]:
@@ -257,14 +281,17 @@ Please respond in this EXACT JSON format (no markdown, just JSON):
         4. Centers all sprites on consistent-sized canvases
 
         Args:
-            image_path: Path to sprite sheet
+            image_path: Path to sprite sheet, or an already-loaded PIL Image
             rows: Number of rows in grid
             columns: Number of columns in grid
 
         Returns:
             Tuple of (frames_list, frame_width, frame_height)
         """
-        sprite_sheet = Image.open(image_path)
+        if isinstance(image_path, Image.Image):
+            sprite_sheet = image_path
+        else:
+            sprite_sheet = Image.open(image_path)
 
         if sprite_sheet.mode != 'RGBA':
             sprite_sheet = sprite_sheet.convert('RGBA')
@@ -310,29 +337,24 @@ Please respond in this EXACT JSON format (no markdown, just JSON):
 
         print(f"  Found {num_components} connected components")
 
-        # Extract bounding box for each component
+        # Extract bounding box for each component - find_objects gets every label's box in
+        # one pass over the label array instead of one full-image mask per component
         component_boxes = []
-        for i in range(1, num_components + 1):
-            # Find pixels belonging to this component
-            component_mask = labeled_array == i
-            rows, cols = np.where(component_mask)
-
-            if len(rows) == 0:
+        for i, box in enumerate(ndimage.find_objects(labeled_array), start=1):
+            if box is None:
                 continue
 
-            # Get bounding box
-            min_row, max_row = rows.min(), rows.max()
-            min_col, max_col = cols.min(), cols.max()
+            row_slice, col_slice = box
 
             # Calculate area (to filter out noise)
-            area = (max_row - min_row) * (max_col - min_col)
+            area = (row_slice.stop - 1 - row_slice.start) * (col_slice.stop - 1 - col_slice.start)
 
             component_boxes.append({
                 'id': i,
-                'left': int(min_col),
-                'right': int(max_col + 1),
-                'top': int(min_row),
-                'bottom': int(max_row + 1),
+                'left': col_slice.start,
+                'right': col_slice.stop,
+                'top': row_slice.start,
+                'bottom': row_slice.stop,
                 'area': area
             })
 
@@ -475,7 +497,7 @@ Please respond in this EXACT JSON format (no markdown, just JSON):
 
     def rearrange_to_horizontal(
         self,
-        image_path: Union[str, Path],
+        image_path: Union[str, Path, Image.Image],
         output_path: Union[str, Path],
         layout_info: Optional[Dict[str, Any]] = None
     ) -> Tuple[Path, Dict[str, Any]]:
@@ -483,14 +505,19 @@ Please respond in this EXACT JSON format (no markdown, just JSON):
         Rearrange sprite sheet to horizontal layout (1 row × N columns)
 
         Args:
-            image_path: Path to input sprite sheet
+            image_path: Path to input sprite sheet, or an in-memory PIL Image (e.g. straight
+                        from background removal) so no intermediate PNG has to be written
             output_path: Path to save rearranged sprite sheet
-            layout_info: Layout info from analyze_sprite_sheet_layout() (if None, will analyze)
+            layout_info: Layout info from analyze_sprite_sheet_layout() (if None, will analyze;
+                         required when image_path is a PIL Image)
 
         Returns:
             Tuple of (output_path, layout_info)
         """
-        image_path = Path(image_path)
+        if not isinstance(image_path, Image.Image):
+            image_path = Path(image_path)
+        elif layout_info is None:
+            raise ValueError("layout_info is required when passing an in-memory image")
         output_path = Path(output_path)
 
         # Analyze layout if not provided
@@ -527,7 +554,7 @@ Please respond in this EXACT JSON format (no markdown, just JSON):
 
         # Save rearranged sprite sheet
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        horizontal_sheet.save(output_path, 'PNG')
+        horizontal_sheet.save(output_path, 'PNG', compress_level=1)
 
         print(f"✓ Rearranged sprite sheet saved to: {output_path}")
 
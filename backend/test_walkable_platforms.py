@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test script for walkable platform detection on test_background.png
+"""
+
+import sys
+from pathlib import Path
+
+from analyze_walkable_platforms import (
+    analyze_walkable_platforms,
+    get_platform_y,
+    load_background,
+    query_platforms,
+)
+
+# (name, min x, max x, top y) of the grass surfaces drawn in test_background.png
+EXPECTED_PLATFORMS = [
+    ("Bottom ground", 0, 1024, 656),
+    ("Left island", 0, 192, 400),
+    ("Middle island", 304, 537, 496),
+    ("Right island", 768, 1000, 400),
+]
+POSITION_TOLERANCE = 10
+
+
+def find_platform(platforms, x_min, x_max, y):
+    """Platform covering [x_min, x_max) within POSITION_TOLERANCE whose top is near y"""
+    for p in platforms:
+        if (abs(p['y'] - y) <= POSITION_TOLERANCE
+                and p['x'] <= x_min + POSITION_TOLERANCE
+                and p['x'] + p['width'] >= x_max - POSITION_TOLERANCE):
+            return p
+    return None
+
+
+def main():
+    print("🧪 Testing Walkable Platform Detection\n")
+    print("=" * 70)
+
+    test_background = Path("test_background.png")
+    if not test_background.exists():
+        print(f"❌ Test background not found: {test_background}")
+        return False
+
+    analysis = analyze_walkable_platforms(load_background(test_background))
+    platforms = analysis['platforms']
+    failures = []
+
+    print("\n📊 Test 1: Bottom ground and islands are detected...")
+    for name, x_min, x_max, y in EXPECTED_PLATFORMS:
+        platform = find_platform(platforms, x_min, x_max, y)
+        if platform:
+            print(f"   ✓ {name}: {platform['name']} @ ({platform['x']}, {platform['y']}) "
+                  f"width {platform['width']}")
+        else:
+            failures.append(f"{name} not found (expected x={x_min}-{x_max}, y≈{y})")
+
+    print("\n🌳 Test 2: Tree canopies are not platforms...")
+    # Canopy tops of the trees on the left island and the right island
+    for x, canopy_y in ((60, 336), (850, 312)):
+        hit = [p for p in platforms if p['x'] <= x < p['x'] + p['width'] and p['y'] < canopy_y + 20]
+        if hit:
+            failures.append(f"Canopy at x={x} detected as {hit[0]['name']} (y={hit[0]['y']})")
+        else:
+            print(f"   ✓ Canopy at x={x} ignored")
+
+    print("\n📍 Test 3: Lookups return the stacked platforms...")
+    checks = [
+        ("get_platform_y(x=10)", get_platform_y(analysis, 10), 400),
+        ("get_platform_y(x=10, below_y=401)", get_platform_y(analysis, 10, below_y=401), 656),
+    ]
+    for label, actual, expected in checks:
+        if actual is None or abs(actual - expected) > POSITION_TOLERANCE:
+            failures.append(f"{label} = {actual}, expected ≈{expected}")
+        else:
+            print(f"   ✓ {label} = {actual}")
+    if query_platforms(analysis, 0, 700, 100, 100):
+        print("   ✓ query_platforms(0, 700, 100, 100) hits the bottom ground")
+    else:
+        failures.append("query_platforms(0, 700, 100, 100) returned no platforms")
+
+    print("\n🏁 Test 4: Spawn is above the bottom ground...")
+    spawn = analysis['spawn']
+    ground_y = get_platform_y(analysis, spawn['x'], below_y=spawn['y'])
+    if ground_y is None or abs(ground_y - EXPECTED_PLATFORMS[0][3]) > POSITION_TOLERANCE:
+        failures.append(f"Spawn ({spawn['x']}, {spawn['y']}) lands on y={ground_y}, not the bottom ground")
+    else:
+        print(f"   ✓ Spawn ({spawn['x']}, {spawn['y']}) lands on the bottom ground at y={ground_y}")
+
+    print("\n" + "=" * 70)
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return False
+    print("✅ All tests passed!")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)